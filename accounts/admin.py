@@ -8,3 +8,7 @@ admin.site.register(models.StudentResult)
 admin.site.register(models.StudentAttendance)
 admin.site.register(models.TotalClassCount)
 admin.site.register(models.Subject)
+admin.site.register(models.AttendanceSummary)
+admin.site.register(models.RollSequence)
+admin.site.register(models.SemesterStanding)
+admin.site.register(models.Job)
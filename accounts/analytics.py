@@ -0,0 +1,213 @@
+"""
+Class performance reports computed with NumPy.
+
+The columns a report needs are streamed once with
+``values_list(...).iterator()`` into arrays, text columns (year, semester,
+class, subject) stored as integer codes, and the arrays are cached until
+results or attendance change. Every statistic is then computed over whole
+arrays: one sort puts each group's grades in order, so medians and
+percentiles are index arithmetic, and counts, sums and histograms come
+from ``np.bincount``.
+"""
+import itertools
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from . import caching
+from . import facets
+from . import models
+
+
+ANALYTICS_TIMEOUT = 60 * 60 * 24
+CHUNK_SIZE = 5000
+
+PASS_CGPA = 2.0
+PERCENTILES = (25, 75, 90)
+# Attendance rate buckets: 0-10%, 10-20%, ... 90-100%
+ATTENDANCE_BINS = 10
+
+
+def _encode(values, codes):
+    # Few distinct labels per chunk, so only they go through Python
+    labels, inverse = np.unique(values, return_inverse=True)
+    mapping = np.array([codes.setdefault(label, len(codes)) for label in labels.tolist()], dtype=np.int32)
+    return mapping[inverse.reshape(-1)]
+
+
+def _read(queryset, numeric, labels):
+    """
+    Stream ``queryset`` into one array per column, ``CHUNK_SIZE`` rows at a
+    time. ``numeric`` maps field names to dtypes; ``labels`` fields are
+    returned as int32 codes, with the label list for each under
+    ``<name>_labels``.
+    """
+    names = [*numeric, *labels]
+    dtype = [(name, numeric.get(name, object)) for name in names]
+    codes = {name: {} for name in labels}
+    parts = {name: [] for name in names}
+
+    rows = queryset.order_by().values_list(*names).iterator(chunk_size=CHUNK_SIZE)
+    while chunk := list(itertools.islice(rows, CHUNK_SIZE)):
+        block = np.array(chunk, dtype=dtype)
+        for name in numeric:
+            parts[name].append(block[name])
+        for name in labels:
+            parts[name].append(_encode(block[name], codes[name]))
+
+    columns = {}
+    for name in names:
+        empty = np.empty(0, dtype=numeric.get(name, np.int32))
+        columns[name] = np.concatenate(parts[name]) if parts[name] else empty
+    for name in labels:
+        columns[f'{name}_labels'] = list(codes[name])
+    return columns
+
+
+def _cached(namespaces, name, compute):
+    key = f'accounts:analytics:{name}:{caching.version_token(*namespaces)}'
+    return cache.get_or_set(key, compute, ANALYTICS_TIMEOUT)
+
+
+def result_columns():
+    """
+    Every result's grade with its year, semester, class and subject codes.
+    """
+    def compute():
+        queryset = models.StudentResult.objects.annotate(
+            class_label=Coalesce('user__studentprofile__class_list', Value('')),
+            subject_key=Coalesce('subject_id', Value(0)),
+        )
+        return _read(queryset, {'cgpa': np.float64}, ('year', 'semester', 'class_label', 'subject_key'))
+
+    return _cached([caching.RESULTS, caching.STUDENTS], 'results', compute)
+
+
+def attendance_columns():
+    """
+    Classes held and attended per student and subject, from AttendanceSummary.
+    """
+    def compute():
+        queryset = models.AttendanceSummary.objects.filter(total_classes__gt=0).annotate(
+            class_label=Coalesce('user__studentprofile__class_list', Value('')),
+            subject_key=Coalesce('subject_id', Value(0)),
+        )
+        numeric = {'total_classes': np.int64, 'total_present': np.int64}
+        return _read(queryset, numeric, ('class_label', 'subject_key'))
+
+    return _cached([caching.ATTENDANCE, caching.STUDENTS], 'attendance', compute)
+
+
+def _mask(columns, **filters):
+    mask = np.ones(len(columns['class_label']), dtype=bool)
+    for name, value in filters.items():
+        if value:
+            labels = columns[f'{name}_labels']
+            mask &= columns[name] == (labels.index(value) if value in labels else -1)
+    return mask
+
+
+def _groups(columns, mask):
+    """
+    One group per (class, subject) present under ``mask``. Returns the
+    group index of every masked row and a dict describing each group.
+    """
+    subject_labels = columns['subject_key_labels']
+    keys = columns['class_label'][mask].astype(np.int64) * len(subject_labels) + columns['subject_key'][mask]
+    present, group_of_row = np.unique(keys, return_inverse=True)
+
+    subject_names = dict(models.Subject.objects.values_list('id', 'subject'))
+    class_labels = columns['class_label_labels']
+    groups = []
+    for key in present.tolist():
+        class_list = class_labels[key // len(subject_labels)]
+        subject_id = subject_labels[key % len(subject_labels)]
+        groups.append({
+            'class_list': class_list or '-',
+            'subject': subject_names.get(subject_id, 'No subject'),
+        })
+    return group_of_row.reshape(-1), groups
+
+
+def _sorted_groups(groups):
+    return sorted(groups, key=lambda group: (facets.class_order(group['class_list']), group['subject']))
+
+
+def grade_report(year='', semester='', class_list=''):
+    """
+    Mean, median, spread, percentiles and pass rate of ``cgpa`` per class
+    and subject.
+    """
+    columns = result_columns()
+    mask = _mask(columns, year=year, semester=semester, class_label=class_list)
+    if not mask.any():
+        return []
+
+    cgpa = columns['cgpa'][mask]
+    group_of_row, groups = _groups(columns, mask)
+    counts = np.bincount(group_of_row, minlength=len(groups))
+
+    # Sort by group, then grade: each group is a contiguous, ordered run
+    ordered = cgpa[np.lexsort((cgpa, group_of_row))]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    def percentile(q):
+        # Linear interpolation between the closest ranks, as np.percentile does
+        position = starts + (counts - 1) * (q / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+    means = np.bincount(group_of_row, weights=cgpa) / counts
+    squares = np.bincount(group_of_row, weights=cgpa ** 2) / counts
+    stats = {
+        'count': counts,
+        'mean': means,
+        'std': np.sqrt(np.maximum(squares - means ** 2, 0)),
+        'minimum': ordered[starts],
+        'median': percentile(50),
+        'maximum': ordered[starts + counts - 1],
+        'pass_rate': np.bincount(group_of_row, weights=cgpa >= PASS_CGPA) / counts * 100,
+    }
+    percentiles = np.column_stack([percentile(q) for q in PERCENTILES])
+
+    stats = {name: values.tolist() for name, values in stats.items()}
+    for index, group in enumerate(groups):
+        group.update({name: values[index] for name, values in stats.items()})
+        group['percentiles'] = list(zip(PERCENTILES, percentiles[index].tolist()))
+    return _sorted_groups(groups)
+
+
+def attendance_report(class_list=''):
+    """
+    Histogram of per-student attendance rates, plus the mean rate, per class
+    and subject.
+    """
+    columns = attendance_columns()
+    mask = _mask(columns, class_label=class_list)
+    if not mask.any():
+        return []
+
+    rates = columns['total_present'][mask] / columns['total_classes'][mask]
+    group_of_row, groups = _groups(columns, mask)
+    counts = np.bincount(group_of_row, minlength=len(groups))
+
+    # 100% falls in the top bucket rather than one of its own
+    buckets = np.minimum((rates * ATTENDANCE_BINS).astype(np.int64), ATTENDANCE_BINS - 1)
+    histograms = np.bincount(
+        group_of_row * ATTENDANCE_BINS + buckets,
+        minlength=len(groups) * ATTENDANCE_BINS,
+    ).reshape(len(groups), ATTENDANCE_BINS)
+    shares = histograms / counts[:, None] * 100
+    means = np.bincount(group_of_row, weights=rates) / counts * 100
+
+    step = 100 // ATTENDANCE_BINS
+    for index, group in enumerate(groups):
+        group['students'] = int(counts[index])
+        group['mean_rate'] = float(means[index])
+        group['histogram'] = [
+            {'label': f'{bucket * step}-{bucket * step + step}%', 'count': count, 'share': share}
+            for bucket, (count, share) in enumerate(zip(histograms[index].tolist(), shares[index].tolist()))
+        ]
+    return _sorted_groups(groups)
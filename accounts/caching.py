@@ -0,0 +1,86 @@
+"""
+Version counters for cached data.
+
+Each cached value is stored under a key containing the current version of
+its namespace. Bumping the version (from signals) makes every older entry
+unreachable at once; they simply expire.
+
+Versions start from the clock rather than 1. A counter that is evicted (or
+lost with a cache restart) is then reseeded above any value it reached
+before, so it can't land back on a version that still has entries.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def _version_key(namespace):
+    return f'accounts:version:{namespace}'
+
+
+def _new_version():
+    # Bumps add 1 each, far fewer than the nanoseconds between two seeds
+    return time.time_ns()
+
+
+def get_version(namespace):
+    return cache.get_or_set(_version_key(namespace), _new_version, None)
+
+
+async def aget_version(namespace):
+    return await cache.aget_or_set(_version_key(namespace), _new_version, None)
+
+
+def bump_version(namespace):
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        # Not in the cache (evicted or never read): reseed past every old value
+        cache.set(_version_key(namespace), _new_version(), None)
+
+
+def versioned_key(namespace, *parts):
+    return ':'.join(['accounts', namespace, str(get_version(namespace)), *map(str, parts)])
+
+
+async def aversioned_key(namespace, *parts):
+    return ':'.join(['accounts', namespace, str(await aget_version(namespace)), *map(str, parts)])
+
+
+# Page and fragment cache namespaces (see signals)
+SUBJECTS = 'subjects'
+STUDENTS = 'students'
+RESULTS = 'results'
+ATTENDANCE = 'attendance'
+
+
+def user_namespace(user_id):
+    return f'user:{user_id}'
+
+
+def student_namespace(user_id):
+    return f'student:{user_id}'
+
+
+def bump_students(user_ids):
+    for user_id in user_ids:
+        bump_version(student_namespace(user_id))
+
+
+def version_token(*namespaces):
+    """
+    One string combining the current versions of ``namespaces``, for use in
+    cache keys and ``{% cache %}`` vary-on arguments. Reads them in one
+    round trip once they exist.
+    """
+    keys = [_version_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    versions = [found.get(key) or cache.get_or_set(key, _new_version, None) for key in keys]
+    return '-'.join(f'{namespace}.{version}' for namespace, version in zip(namespaces, versions))
+
+
+async def aversion_token(*namespaces):
+    keys = [_version_key(namespace) for namespace in namespaces]
+    found = await cache.aget_many(keys)
+    versions = [found.get(key) or await cache.aget_or_set(key, _new_version, None) for key in keys]
+    return '-'.join(f'{namespace}.{version}' for namespace, version in zip(namespaces, versions))
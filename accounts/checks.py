@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Role snapshots, cached pages and sessions are invalidated by bumping
+    version counters in the cache; a per-process cache keeps serving stale
+    ones (a demoted user stays staff) in every other worker.
+    """
+    if settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+        return [Error(
+            "The default cache is the per-process local-memory cache.",
+            hint="Set CACHE_BACKEND=file or redis so every worker process shares it.",
+            id='accounts.E001',
+        )]
+    return []
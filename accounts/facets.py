@@ -0,0 +1,62 @@
+"""
+Filter dropdown values (with counts) for the result and student lists,
+computed with one grouped query each and cached until the underlying
+tables change.
+"""
+from django.core.cache import cache
+from django.db.models import Count
+from . import caching
+from . import models
+
+
+FACET_TIMEOUT = 60 * 60 * 24
+
+RESULT_FACETS = 'result_facets'
+CLASS_FACETS = 'class_facets'
+
+
+def class_order(value):
+    return int(value) if str(value).isdigit() else -1
+
+
+def _counts(queryset, field):
+    return [
+        {'value': row[field], 'count': row['count']}
+        for row in queryset.values(field).annotate(count=Count('id')).order_by()
+        if row[field] is not None
+    ]
+
+
+def _compute_result_facets():
+    results = models.StudentResult.objects.all()
+    classes = _counts(results, 'user__studentprofile__class_list')
+    return {
+        'years': sorted(_counts(results, 'year'), key=lambda row: row['value'], reverse=True),
+        'semesters': sorted(_counts(results, 'semester'), key=lambda row: row['value']),
+        'classes': sorted(classes, key=lambda row: class_order(row['value'])),
+    }
+
+
+def _compute_class_facets():
+    profiles = models.StudentProfile.objects.all()
+    return sorted(_counts(profiles, 'class_list'), key=lambda row: class_order(row['value']))
+
+
+def result_facets():
+    key = caching.versioned_key(RESULT_FACETS)
+    return cache.get_or_set(key, _compute_result_facets, FACET_TIMEOUT)
+
+
+def class_facets():
+    key = caching.versioned_key(CLASS_FACETS)
+    return cache.get_or_set(key, _compute_class_facets, FACET_TIMEOUT)
+
+
+def invalidate_results():
+    caching.bump_version(RESULT_FACETS)
+
+
+def invalidate_classes():
+    caching.bump_version(CLASS_FACETS)
+    # Result facets group by the student's class as well
+    caching.bump_version(RESULT_FACETS)
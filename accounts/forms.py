@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from . import models
+from . import widgets
 
 
 class UserCreateForm(UserCreationForm):
@@ -61,6 +62,9 @@ class StudentAddResult(forms.ModelForm):
             'subject',
             'cgpa'
         )
+        widgets = {
+            'roll': widgets.StudentAutocompleteWidget(),
+        }
 
     def clean(self):
         cleaned_data = super().clean()
@@ -96,7 +100,39 @@ class StudentAddAttandance(forms.ModelForm):
             'subject',
             'status',
         )
+        widgets = {
+            'roll': widgets.StudentAutocompleteWidget(),
+        }
         
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        
+        # Validation looks up a single profile; the widget never lists them all
+        self.fields['roll'].queryset = models.StudentProfile.objects.select_related('user').filter(user__role='Student')
+        
+class ClassAttendanceForm(forms.Form):
+    class_list = forms.ChoiceField(choices=models.StudentProfile.CLASS_CHOICES, label="Class")
+    subject = forms.ModelChoiceField(queryset=models.Subject.objects.all())
+    
+class ClassResultForm(forms.Form):
+    class_list = forms.ChoiceField(choices=models.StudentProfile.CLASS_CHOICES, label="Class")
+    year = forms.CharField(max_length=50)
+    semester = forms.CharField(max_length=50)
+    subject = forms.ModelChoiceField(queryset=models.Subject.objects.all())
+    
+class AttendanceFilterForm(forms.Form):
+    year = forms.IntegerField(required=False)
+    subject = forms.IntegerField(required=False)
+    
+class StudentImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV or XLSX with first_name, last_name, email and class columns.")
+    
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if not file.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError("Upload a .csv or .xlsx file.")
+        return file
+    
 class StudentResultUpdate(forms.ModelForm):
     class Meta:
         model = models.StudentResult
@@ -0,0 +1,169 @@
+import csv
+import datetime
+import io
+import uuid
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from . import caching
+from . import facets
+from . import models
+from . import search
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, row_number, message):
+        self.errors.append((row_number, message))
+
+
+def read_rows(file, filename):
+    """
+    Yield ``(row_number, row)`` pairs from a CSV or XLSX upload without
+    loading the whole file. Header names are matched case-insensitively.
+    """
+    if filename.lower().endswith('.xlsx'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFileError("Reading .xlsx files requires the openpyxl package.")
+        sheet = load_workbook(file, read_only=True, data_only=True).active
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(cell or '').strip().lower() for cell in next(rows, ())]
+        for number, values in enumerate(rows, start=2):
+            yield number, {key: '' if value is None else str(value).strip() for key, value in zip(header, values)}
+    else:
+        reader = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+        header = [cell.strip().lower() for cell in next(reader, [])]
+        for number, values in enumerate(reader, start=2):
+            yield number, {key: value.strip() for key, value in zip(header, values)}
+
+
+def _clean_row(row, seen_emails):
+    first_name = row.get('first_name', '')
+    last_name = row.get('last_name', '')
+    email = row.get('email', '')
+    class_list = row.get('class_list') or row.get('class', '')
+
+    if not first_name or not last_name or not email:
+        raise ValidationError("first_name, last_name and email are required.")
+    validate_email(email)
+    if class_list not in dict(models.StudentProfile.CLASS_CHOICES):
+        raise ValidationError(f"Unknown class '{class_list}'.")
+    if email in seen_emails:
+        raise ValidationError(f"Email {email} appears more than once in the file.")
+    seen_emails.add(email)
+
+    return {
+        'first_name': first_name,
+        'last_name': last_name,
+        'email': email,
+        'class_list': class_list,
+    }
+
+
+def _save_chunk(students, year):
+    users = []
+    for student in students:
+        user = models.User(
+            first_name=student['first_name'],
+            last_name=student['last_name'],
+            email=student['email'],
+            role='Student',
+            # Replaced below once the primary key is known
+            username=uuid.uuid4().hex,
+        )
+        # Same effect as the random password StudentCreateView sets, without hashing per row
+        user.set_unusable_password()
+        users.append(user)
+
+    with transaction.atomic():
+        models.User.objects.bulk_create(users)
+        for user in users:
+            user.username = f'{user.first_name}{user.last_name}{user.id}'
+        models.User.objects.bulk_update(users, ['username'])
+
+        by_class = {}
+        for user, student in zip(users, students):
+            by_class.setdefault(student['class_list'], []).append(user)
+
+        profiles = []
+        for class_list, class_users in by_class.items():
+            number = models.RollSequence.objects.allocate(year, class_list, count=len(class_users))
+            for offset, user in enumerate(class_users):
+                profiles.append(models.StudentProfile(
+                    user=user,
+                    class_list=class_list,
+                    roll=models.StudentProfile.make_roll(year, class_list, number + offset),
+                ))
+        models.StudentProfile.objects.bulk_create(profiles)
+        search.index_users([user.pk for user in users])
+        facets.invalidate_classes()
+        caching.bump_version(caching.STUDENTS)
+
+    return users
+
+
+def import_students(rows, chunk_size=500, year=None, progress=None):
+    """
+    Create students and their profiles from ``(row_number, row)`` pairs.
+
+    Rows are validated and written one chunk at a time; a bad row is
+    reported in the returned ImportReport and never stops the import. A
+    chunk the database rejects is retried one row at a time.
+    ``progress(rows_read, report)`` is called after each chunk.
+    """
+    year = year or datetime.datetime.now().year
+    report = ImportReport()
+    seen_emails = set()
+    rows = iter(rows)
+    rows_read = 0
+
+    while chunk := list(islice(rows, chunk_size)):
+        rows_read += len(chunk)
+        valid = []
+        for row_number, row in chunk:
+            try:
+                valid.append((row_number, _clean_row(row, seen_emails)))
+            except ValidationError as error:
+                report.add_error(row_number, ' '.join(error.messages))
+
+        existing = set(
+            models.User.objects.filter(
+                email__in=[student['email'] for row_number, student in valid]
+            ).values_list('email', flat=True)
+        )
+        for row_number, student in valid:
+            if student['email'] in existing:
+                report.add_error(row_number, f"A user with email {student['email']} already exists.")
+        valid = [(row_number, student) for row_number, student in valid if student['email'] not in existing]
+
+        if valid:
+            try:
+                _save_chunk([student for row_number, student in valid], year)
+            except IntegrityError:
+                # Someone else took an email since the check above; save
+                # row by row so only the clashing rows are reported
+                for row_number, student in valid:
+                    try:
+                        _save_chunk([student], year)
+                    except IntegrityError as error:
+                        report.add_error(row_number, f"Could not be saved: {error}")
+                    else:
+                        report.created += 1
+            else:
+                report.created += len(valid)
+        if progress:
+            progress(rows_read, report)
+
+    report.errors.sort()
+    return report
@@ -0,0 +1,42 @@
+import re
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from accounts import models
+
+
+ROLL_PATTERN = re.compile(r'^(?P<year>\d{4})(?P<rest>\d+)$')
+
+
+class Command(BaseCommand):
+    help = "Seed the roll number sequences from the rolls already assigned to students"
+
+    def handle(self, *args, **options):
+        highest = {}
+        skipped = 0
+
+        profiles = models.StudentProfile.objects.values_list('roll', 'class_list').order_by()
+        for roll, class_list in profiles.iterator(chunk_size=2000):
+            match = ROLL_PATTERN.match(roll or '')
+            rest = match['rest'] if match else ''
+            # Rolls are "<year><class><number>"; the class tells us where the number starts
+            if not rest.startswith(class_list) or len(rest) == len(class_list):
+                skipped += 1
+                continue
+            key = (int(match['year']), class_list)
+            highest[key] = max(highest.get(key, 0), int(rest[len(class_list):]))
+
+        with transaction.atomic():
+            for (year, class_list), number in highest.items():
+                sequence, created = models.RollSequence.objects.select_for_update().get_or_create(
+                    year=year,
+                    class_list=class_list,
+                    defaults={'last_value': number},
+                )
+                if not created and sequence.last_value < number:
+                    sequence.last_value = number
+                    sequence.save(update_fields=['last_value'])
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {len(highest)} roll sequences."))
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"Skipped {skipped} rolls that do not match <year><class><number>."))
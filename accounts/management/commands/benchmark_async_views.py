@@ -0,0 +1,120 @@
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from accounts import models
+from accounts import seeding
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the students' result and attendance pages served three ways "
+        "on a throwaway copy of the configured database: sync views through "
+        "the WSGI handler on a thread pool, the same sync views through the "
+        "ASGI handler, and the async views through the ASGI handler. Every "
+        "request has its own query string, so the page and fragment caches "
+        "miss and each one renders from the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=300)
+        parser.add_argument('--requests', type=int, default=600)
+        parser.add_argument('--concurrency', type=int, default=32)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            # Threads can't share an in-memory test database
+            test_settings['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            seeding.seed(students=options['students'], years=1, days=20)
+            results = self.run_modes(options)
+        finally:
+            if getattr(connection, 'pool', None):
+                # Closed connections went back to the pool
+                connection.close_pool()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f"Database: {connection.vendor}, CONN_MAX_AGE: {connection.settings_dict.get('CONN_MAX_AGE')}")
+        self.stdout.write(f"{options['requests']} requests per mode, {options['concurrency']} at a time")
+        for label, elapsed, latencies in results:
+            latencies.sort()
+            self.stdout.write(
+                f"{label:<24} {len(latencies) / elapsed:8.1f} req/s   "
+                f"p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+                f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:7.1f} ms"
+            )
+
+    def run_modes(self, options):
+        clients = []
+        for user in models.User.objects.filter(role='Student', studentprofile__isnull=False).order_by('pk'):
+            client = Client()
+            client.force_login(user)
+            async_client = AsyncClient()
+            async_client.cookies = client.cookies
+            clients.append((client, async_client))
+
+        sync_urls = [reverse('accounts:student_result_list'), reverse('accounts:student_attendance_list')]
+        async_urls = [reverse('accounts:async_student_result_list'), reverse('accounts:async_student_attendance_list')]
+
+        def requests(urls, count):
+            # (client pair, url) for each request, spread over the students
+            for number in range(count):
+                yield clients[number % len(clients)], f'{urls[number % len(urls)]}?request={number}'
+
+        results = []
+        for label, run, urls in (
+            ('WSGI, sync views', self.run_threads, sync_urls),
+            ('ASGI, sync views', self.run_async, sync_urls),
+            ('ASGI, async views', self.run_async, async_urls),
+        ):
+            # Warm the role snapshots and version counters first
+            run(list(requests(urls, len(clients))), options['concurrency'])
+            start = time.perf_counter()
+            latencies = run(list(requests(urls, options['requests'])), options['concurrency'])
+            results.append((label, time.perf_counter() - start, latencies))
+        return results
+
+    def run_threads(self, work, concurrency):
+        def fetch(item):
+            (client, async_client), url = item
+            start = time.perf_counter()
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+            latency = time.perf_counter() - start
+            # The test clients skip this end-of-request step; servers don't
+            close_old_connections()
+            return latency
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            return list(executor.map(fetch, work))
+
+    def run_async(self, work, concurrency):
+        async def main():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch(item):
+                (client, async_client), url = item
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await async_client.get(url)
+                    assert response.status_code == 200, (url, response.status_code)
+                    latency = time.perf_counter() - start
+                    await sync_to_async(close_old_connections)()
+                    return latency
+
+            return await asyncio.gather(*(fetch(item) for item in work))
+
+        return asyncio.run(main())
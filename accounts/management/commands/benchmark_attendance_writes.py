@@ -0,0 +1,115 @@
+import datetime
+import itertools
+import os
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from accounts import models
+from accounts import seeding
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure sustained attendance writes per second on a throwaway copy of "
+        "the configured database. Writer threads insert attendance rows (through "
+        "the same signals as the views) while reader threads load attendance "
+        "pages. Run it once per settings profile to compare them, e.g. "
+        "--settings=student_management.settings_production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--students', type=int, default=500)
+
+    def handle(self, *args, **options):
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            # An in-memory test database would hide every locking effect
+            test_settings['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            seeding.seed(students=options['students'], years=1, days=1)
+            results = self.run_threads(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        seconds = options['seconds']
+        self.stdout.write(f"Database options: {connection.settings_dict.get('OPTIONS') or 'default'}")
+        self.stdout.write(f"CONN_MAX_AGE: {connection.settings_dict.get('CONN_MAX_AGE')}")
+        self.stdout.write(f"Writers: {options['writers']}, readers: {options['readers']}, {seconds:g}s")
+        self.stdout.write(f"Attendance writes: {results['writes']} ({results['writes'] / seconds:.1f}/s)")
+        self.stdout.write(f"Page reads: {results['reads']} ({results['reads'] / seconds:.1f}/s)")
+        if results['locked']:
+            self.stdout.write(self.style.WARNING(f"'database is locked' errors: {results['locked']}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No 'database is locked' errors."))
+        if results['latencies']:
+            latencies = sorted(results['latencies'])
+            p95 = latencies[int(len(latencies) * 0.95)]
+            self.stdout.write(f"Write latency p95: {p95 * 1000:.1f} ms, max: {latencies[-1] * 1000:.1f} ms")
+
+    def run_threads(self, options):
+        profiles = list(models.StudentProfile.objects.values_list('pk', 'user_id'))
+        subject = models.Subject.objects.order_by('pk').first()
+        # Each write gets its own (student, day) so the unique constraint never fires
+        numbers = itertools.count()
+        first_day = datetime.date.today() - datetime.timedelta(days=1)
+        lock = threading.Lock()
+        results = {'writes': 0, 'reads': 0, 'locked': 0, 'latencies': []}
+        deadline = time.perf_counter() + options['seconds']
+
+        def record(key, latency=None):
+            with lock:
+                results[key] += 1
+                if latency is not None:
+                    results['latencies'].append(latency)
+
+        def write():
+            while time.perf_counter() < deadline:
+                number = next(numbers)
+                profile_id, user_id = profiles[number % len(profiles)]
+                start = time.perf_counter()
+                try:
+                    with transaction.atomic():
+                        models.StudentAttendance.objects.create(
+                            user_id=user_id,
+                            roll_id=profile_id,
+                            subject=subject,
+                            status='Present',
+                            created_at=first_day - datetime.timedelta(days=number // len(profiles)),
+                        )
+                except OperationalError:
+                    record('locked')
+                else:
+                    record('writes', time.perf_counter() - start)
+                # Each "request" closes or keeps its connection per CONN_MAX_AGE
+                connection.close_if_unusable_or_obsolete()
+            connection.close()
+
+        def read():
+            while time.perf_counter() < deadline:
+                try:
+                    list(
+                        models.StudentAttendance.objects.select_related('user', 'roll', 'subject')
+                        .with_total_classes().order_by('-created_at', '-id')[:50]
+                    )
+                except OperationalError:
+                    record('locked')
+                else:
+                    record('reads')
+                connection.close_if_unusable_or_obsolete()
+            connection.close()
+
+        threads = [threading.Thread(target=write) for _ in range(options['writers'])]
+        threads += [threading.Thread(target=read) for _ in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
@@ -0,0 +1,132 @@
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, resolve, reverse
+from accounts import models
+from accounts import seeding
+from accounts import tasks
+from accounts import urls
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database at each size and request every "
+        "accounts URL through the test client, recording wall time, query "
+        "count and peak memory. Fails if a view's query count grows with "
+        "the dataset or the page size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--page-sizes', type=int, nargs='+', default=[10, 50])
+        parser.add_argument('--days', type=int, default=2, help="Days of attendance seeded per subject")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            failures = self.run_benchmarks(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if failures:
+            raise CommandError("Query count grows with data or page size:\n" + "\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("Query counts are constant for every view."))
+
+    def run_benchmarks(self, options):
+        query_counts = {}
+        seeded = 0
+        for size in sorted(options['sizes']):
+            seeding.seed(students=size - seeded, years=1, days=options['days'])
+            seeded = size
+            clients = self.get_clients()
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{size} students"))
+            self.stdout.write(f"{'view':<40} {'role':<8} {'page':>5} {'status':>6} {'ms':>9} {'queries':>8} {'peak KiB':>9}")
+
+            for name, url in self.get_urls():
+                view_class = getattr(resolve(url).func, 'view_class', None)
+                page_sizes = options['page_sizes'] if getattr(view_class, 'paginate_by', None) else [None]
+                for role, client in clients.items():
+                    # Load templates and code paths once, outside the timings
+                    client.get(url)
+                    for page_size in page_sizes:
+                        status, elapsed, queries, peak = self.measure(client, url, view_class, page_size)
+                        query_counts.setdefault((name, role), {})[(size, page_size)] = queries
+                        self.stdout.write(
+                            f"{name:<40} {role:<8} {page_size or '-':>5} {status:>6} "
+                            f"{elapsed * 1000:>9.1f} {queries:>8} {peak / 1024:>9.0f}"
+                        )
+
+        failures = []
+        for (name, role), counts in query_counts.items():
+            if len(set(counts.values())) > 1:
+                detail = ', '.join(f"{size} students/page {page}: {count}" for (size, page), count in sorted(counts.items(), key=str))
+                failures.append(f"{name} ({role}): {detail}")
+        return failures
+
+    def get_clients(self):
+        staff, created = models.User.objects.get_or_create(
+            username='benchmark-staff',
+            defaults={'email': 'benchmark-staff@example.com', 'role': 'Admin', 'is_staff': True},
+        )
+        student = models.User.objects.filter(role='Student', studentprofile__isnull=False).order_by('pk').first()
+
+        clients = {}
+        for role, user in (('staff', staff), ('student', student)):
+            clients[role] = Client()
+            clients[role].force_login(user)
+        return clients
+
+    def get_urls(self):
+        student = models.User.objects.filter(role='Student').order_by('pk').first()
+        objects = {
+            'user_': student,
+            'student_result_': models.StudentResult.objects.order_by('pk').first(),
+            'student_attendance_': models.StudentAttendance.objects.order_by('pk').first(),
+            'student_': student,
+            'async_student_': student,
+            'subject_': models.Subject.objects.order_by('pk').first(),
+            # Queued only, never run: the page is what is measured
+            'job_': models.Job.objects.order_by('pk').first() or tasks.enqueue('rebuild_standings'),
+        }
+        for pattern in urls.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            name = f'{urls.app_name}:{pattern.name}'
+            if 'pk' in pattern.pattern.converters:
+                obj = next(obj for prefix, obj in objects.items() if pattern.name.startswith(prefix))
+                yield name, reverse(name, kwargs={'pk': obj.pk})
+            else:
+                yield name, reverse(name)
+
+    def measure(self, client, url, view_class, page_size):
+        original = getattr(view_class, 'paginate_by', None)
+        if page_size:
+            view_class.paginate_by = page_size
+        # Cached pages and fragments would hide the queries behind them, so
+        # every measured request renders from the database
+        cache.clear()
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    for chunk in response.streaming_content:
+                        pass
+                elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            if page_size:
+                view_class.paginate_by = original
+        return response.status_code, elapsed, len(context), peak
@@ -0,0 +1,127 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from accounts import caching
+from accounts import facets
+from accounts import models
+
+
+SOURCE_ALIAS = 'sqlite_source'
+
+# Parents before children so every foreign key already exists when a row lands
+COPY_ORDER = (
+    models.User,
+    models.Subject,
+    models.StudentProfile,
+    models.RollSequence,
+    models.StudentResult,
+    models.StudentAttendance,
+    models.TotalClassCount,
+)
+
+PERMISSION_KEY = ('permission__content_type__app_label', 'permission__content_type__model', 'permission__codename')
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy an existing SQLite database into the configured PostgreSQL database "
+        "in batches, in foreign key order, keeping primary keys. Run `migrate` "
+        "against both databases first; the target must be empty."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', nargs='?', default=str(settings.BASE_DIR / 'db.sqlite3'))
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        target = connections['default']
+        if target.vendor != 'postgresql':
+            raise CommandError("The default database is not PostgreSQL; set POSTGRES_DB and friends first.")
+        if not os.path.exists(options['source']):
+            raise CommandError(f"{options['source']} does not exist.")
+
+        # Register the SQLite file as an extra connection for this run only
+        connections.settings[SOURCE_ALIAS] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': options['source']}
+        connections.configure_settings(connections.settings)
+
+        for model in COPY_ORDER:
+            if model.objects.exists():
+                raise CommandError(f"{model._meta.db_table} already has rows; copy into an empty database.")
+
+        with transaction.atomic():
+            for model in COPY_ORDER:
+                count = self.copy_model(model, options['batch_size'])
+                self.stdout.write(f"{model._meta.db_table}: {count} rows")
+            self.copy_user_relations()
+            self.reset_sequences()
+
+        # Derived data is rebuilt rather than copied
+        models.AttendanceSummary.objects.rebuild()
+        caching.bump_students(models.SemesterStanding.objects.rebuild())
+        facets.invalidate_classes()
+        for namespace in (caching.STUDENTS, caching.RESULTS, caching.ATTENDANCE, caching.SUBJECTS):
+            caching.bump_version(namespace)
+        connections[SOURCE_ALIAS].close()
+        self.stdout.write(self.style.SUCCESS("Copy finished; attendance summaries and standings rebuilt."))
+
+    def copy_model(self, model, batch_size):
+        queryset = model._base_manager.using(SOURCE_ALIAS).order_by('pk')
+        copied = 0
+        last_pk = None
+        while True:
+            batch = queryset.filter(pk__gt=last_pk) if last_pk is not None else queryset
+            rows = list(batch[:batch_size])
+            if not rows:
+                return copied
+            model._base_manager.bulk_create(rows, batch_size=batch_size)
+            copied += len(rows)
+            last_pk = rows[-1].pk
+
+    def copy_user_relations(self):
+        """
+        Groups and permissions are matched by name, since their ids on the
+        target come from its own migrations.
+        """
+        groups = {
+            name: Group.objects.get_or_create(name=name)[0].pk
+            for name in Group.objects.using(SOURCE_ALIAS).values_list('name', flat=True)
+        }
+        permissions = {
+            (app_label, model, codename): pk
+            for pk, app_label, model, codename in Permission.objects.values_list(
+                'pk', 'content_type__app_label', 'content_type__model', 'codename'
+            )
+        }
+
+        UserGroup = models.User.groups.through
+        UserGroup.objects.bulk_create([
+            UserGroup(user_id=row['user_id'], group_id=groups[row['group__name']])
+            for row in UserGroup.objects.using(SOURCE_ALIAS).values('user_id', 'group__name')
+        ])
+
+        UserPermission = models.User.user_permissions.through
+        user_permissions = [
+            UserPermission(user_id=row[0], permission_id=permissions.get(tuple(row[1:])))
+            for row in UserPermission.objects.using(SOURCE_ALIAS).values_list('user_id', *PERMISSION_KEY)
+        ]
+        UserPermission.objects.bulk_create([row for row in user_permissions if row.permission_id])
+
+        GroupPermission = Group.permissions.through
+        group_permissions = [
+            GroupPermission(group_id=groups[row[0]], permission_id=permissions.get(tuple(row[1:])))
+            for row in GroupPermission.objects.using(SOURCE_ALIAS).values_list('group__name', *PERMISSION_KEY)
+        ]
+        GroupPermission.objects.bulk_create(
+            [row for row in group_permissions if row.permission_id],
+            ignore_conflicts=True,
+        )
+
+    def reset_sequences(self):
+        statements = connections['default'].ops.sequence_reset_sql(no_style(), COPY_ORDER)
+        with connections['default'].cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
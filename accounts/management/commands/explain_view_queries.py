@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from accounts import models
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plans of the main list view queries and flag full "
+        "table scans. Run it on a seeded database (see seed_data) before and "
+        "after changing indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help="Refresh the planner statistics first (ANALYZE) so plans match a long-running database",
+        )
+
+    def get_cases(self, page_size):
+        student = models.User.objects.filter(role='Student').order_by('-pk').first()
+        profile = models.StudentProfile.objects.order_by('-pk').first()
+        result = models.StudentResult.objects.order_by('-pk').first()
+        year = result.year if result else '2025'
+        semester = result.semester if result else '1st'
+        class_list = profile.class_list if profile else '1'
+
+        results = models.StudentResult.objects.select_related('user', 'user__studentprofile', 'subject')
+        attendance = models.StudentAttendance.objects.select_related('user', 'user__studentprofile', 'subject').filter(user__role='Student')
+
+        return [
+            ("Student list", models.User.objects.filter(role='Student').order_by('-date_joined', '-id')[:page_size]),
+            ("Results: staff, first page", results.order_by('-year', 'semester', 'id')[:page_size]),
+            ("Results: year + semester filter", results.filter(year=year, semester=semester).order_by('-year', 'semester', 'id')[:page_size]),
+            ("Results: class filter", results.filter(user__studentprofile__class_list=class_list).order_by('-year', 'semester', 'id')[:page_size]),
+            ("Results: one student", results.filter(user=student).order_by('-year', 'semester', 'id')[:page_size]),
+            ("Results: year/semester buckets", models.StudentResult.objects.values('year', 'semester').order_by('-year', 'semester')),
+            ("Attendance: staff, first page", attendance.order_by('-created_at', '-id')[:page_size]),
+            ("Attendance: one student", attendance.filter(user=student).order_by('-created_at', '-id')[:page_size]),
+            ("Total classes: one student and subject", models.TotalClassCount.objects.filter(user=student).values('user', 'subject').annotate(total=Sum('total_class_count')).order_by()),
+            ("Class roster", models.StudentProfile.objects.filter(class_list=class_list).order_by('roll')),
+        ]
+
+    def is_full_scan(self, line):
+        if connection.vendor == 'sqlite':
+            # "SCAN t USING INDEX ..." walks an index in order, not the table
+            return 'SCAN ' in line and 'USING' not in line
+        return 'Seq Scan' in line
+
+    def is_sort(self, line):
+        if connection.vendor == 'sqlite':
+            return 'TEMP B-TREE' in line
+        return line.strip().startswith(('Sort', '->  Sort'))
+
+    def handle(self, *args, **options):
+        if options['analyze']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        full_scans = sorts = 0
+        for name, queryset in self.get_cases(options['page_size']):
+            plan = queryset.explain()
+            lines = plan.splitlines()
+            full_scans += any(self.is_full_scan(line) for line in lines)
+            sorts += any(self.is_sort(line) for line in lines)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            self.stdout.write('')
+
+        style = self.style.WARNING if full_scans or sorts else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{full_scans} of the queries above scan a whole table, {sorts} sort rows outside an index."
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts import importers
+
+
+class Command(BaseCommand):
+    help = "Import students from a CSV or XLSX file with first_name, last_name, email and class columns"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--year', type=int, help="Year used for the roll numbers (default: current year)")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, 'rb') as file:
+                report = importers.import_students(
+                    importers.read_rows(file, path),
+                    chunk_size=options['chunk_size'],
+                    year=options['year'],
+                )
+        except (OSError, UnicodeDecodeError, importers.ImportFileError) as error:
+            raise CommandError(error)
+
+        for row_number, message in report.errors:
+            self.stderr.write(f"Row {row_number}: {message}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {report.created} students ({len(report.errors)} rows skipped)."))
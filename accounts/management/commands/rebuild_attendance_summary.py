@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from accounts import caching
+from accounts import models
+
+
+class Command(BaseCommand):
+    help = "Rebuild the AttendanceSummary table from attendance and class count records"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help="Only rebuild these user ids")
+
+    def handle(self, *args, **options):
+        models.AttendanceSummary.objects.rebuild(users=options['users'])
+        caching.bump_version(caching.ATTENDANCE)
+        count = models.AttendanceSummary.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"Attendance summary rebuilt ({count} rows)."))
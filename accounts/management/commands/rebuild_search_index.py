@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from accounts import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the user search index from the User and StudentProfile tables"
+
+    def handle(self, *args, **options):
+        if not search.index_available():
+            self.stdout.write(self.style.WARNING("No search index table on this database; searches use icontains."))
+            return
+        search.index_users()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from accounts import caching
+from accounts import models
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SemesterStanding table (semester GPA and class rank) from StudentResult"
+
+    def handle(self, *args, **options):
+        changed = models.SemesterStanding.objects.rebuild()
+        caching.bump_version(caching.RESULTS)
+        # Students' own result pages are versioned per student
+        caching.bump_students(changed)
+        count = models.SemesterStanding.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Semester standings rebuilt ({count} rows, {len(changed)} students changed)."
+        ))
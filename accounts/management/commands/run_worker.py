@@ -0,0 +1,84 @@
+import datetime
+import multiprocessing
+import os
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+from accounts import models
+from accounts import tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs (imports, rebuilds) on a pool of worker "
+        "processes, one per CPU core by default. Keep one or more running "
+        "under a process supervisor next to the web server, with a shared "
+        "cache (CACHE_BACKEND=file or redis) so cached pages see the jobs' "
+        "changes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds between polls when idle")
+        parser.add_argument(
+            '--stale-after', type=int, default=60 * 60,
+            help="Requeue jobs left running longer than this many seconds (a worker died)",
+        )
+        parser.add_argument('--burst', action='store_true', help="Exit once the queue is empty")
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        worker = tasks.worker_name()
+
+        if settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+            self.stdout.write(self.style.WARNING(
+                "The local-memory cache is per process: the web server will not see "
+                "cache invalidations made by jobs. Set CACHE_BACKEND=file or redis."
+            ))
+
+        stale = timezone.now() - datetime.timedelta(seconds=options['stale_after'])
+        requeued = models.Job.objects.requeue_stale(stale)
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale jobs."))
+
+        # Spawn rather than fork, so no child ever inherits an open database
+        # connection from this process (or one a respawned child would copy).
+        # Spawned children configure Django themselves before taking jobs.
+        context = multiprocessing.get_context('spawn')
+        self.stdout.write(f"Worker {worker} running {processes} processes.")
+        with context.Pool(processes, initializer=django.setup) as pool:
+            running = {}
+            try:
+                while True:
+                    for job_id, outcome in list(running.items()):
+                        if outcome.ready():
+                            del running[job_id]
+                            try:
+                                self.stdout.write(f"Job {job_id}: {outcome.get()}")
+                            except Exception as error:
+                                # Recording the outcome failed; requeue_stale picks it up
+                                self.stderr.write(f"Job {job_id}: worker error: {error!r}")
+
+                    job = None
+                    if len(running) < processes:
+                        job = models.Job.objects.claim(worker)
+                        close_old_connections()
+                    if job:
+                        self.stdout.write(f"Job {job.pk}: {job.name} (attempt {job.attempts})")
+                        running[job.pk] = pool.apply_async(tasks.run_job, (job.pk,))
+                        continue
+
+                    if options['burst'] and not running and not self.has_due_jobs():
+                        break
+                    time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping; waiting for running jobs.")
+            pool.close()
+            pool.join()
+
+    def has_due_jobs(self):
+        return models.Job.objects.filter(status='Queued', run_at__lte=timezone.now()).exists()
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from accounts import seeding
+
+
+class Command(BaseCommand):
+    help = "Bulk-create synthetic students with results, attendance and class counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--subjects', type=int, default=8)
+        parser.add_argument('--years', type=int, default=2, help="Years of results, two semesters each")
+        parser.add_argument('--days', type=int, default=5, help="Days of attendance per subject")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, for reproducible datasets")
+
+    def handle(self, *args, **options):
+        seeding.seed(
+            students=options['students'],
+            subjects=options['subjects'],
+            years=options['years'],
+            days=options['days'],
+            batch_size=options['batch_size'],
+            seed_value=options['seed'],
+            stdout=self.stdout,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Seeded {options['students']} students."))
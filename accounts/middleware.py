@@ -0,0 +1,148 @@
+"""
+Opt-in request profiling.
+
+Enable with ``REQUEST_PROFILING = True``. Every request then gets a
+``Server-Timing`` header (SQL count/time, duplicated queries, template
+render time, total latency) and is added to a rolling per-view summary
+that staff can read at ``accounts:request_profile``.
+"""
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LISTS = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+
+
+def fingerprint(sql):
+    """
+    Normalise a statement so queries differing only in their parameters
+    (the N+1 pattern) share one fingerprint.
+    """
+    sql = _STRINGS.sub('?', sql)
+    sql = _NUMBERS.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _PLACEHOLDER_LISTS.sub('(...)', sql)
+    return ' '.join(sql.split())
+
+
+class RequestProfile:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.view = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.total_time = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def duplicates(self):
+        return {sql: count for sql, count in self.fingerprints.items() if count > 1}
+
+    def server_timing(self):
+        return ', '.join([
+            f'sql;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries"',
+            f'dup;desc="{sum(self.duplicates.values())} duplicated"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ])
+
+
+class ViewStats:
+    """
+    In-process rolling window of the last ``size`` requests per view.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, profile):
+        sample = (profile.total_time, profile.sql_time, profile.template_time, profile.queries, profile.duplicates)
+        with self.lock:
+            self.samples.setdefault(profile.view, deque(maxlen=self.size)).append(sample)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+    def summary(self):
+        with self.lock:
+            samples = {view: list(rows) for view, rows in self.samples.items()}
+
+        rows = []
+        for view, window in samples.items():
+            totals = sorted(sample[0] for sample in window)
+            duplicates = Counter()
+            for sample in window:
+                duplicates.update(sample[4])
+            count = len(window)
+            rows.append({
+                'view': view,
+                'requests': count,
+                'avg_ms': sum(totals) / count * 1000,
+                'p95_ms': totals[min(count - 1, int(count * 0.95))] * 1000,
+                'avg_sql_ms': sum(sample[1] for sample in window) / count * 1000,
+                'avg_template_ms': sum(sample[2] for sample in window) / count * 1000,
+                'avg_queries': sum(sample[3] for sample in window) / count,
+                'max_queries': max(sample[3] for sample in window),
+                'duplicates': duplicates.most_common(3),
+            })
+        return sorted(rows, key=lambda row: row['avg_ms'], reverse=True)
+
+
+stats = ViewStats(getattr(settings, 'REQUEST_PROFILING_WINDOW', 200))
+
+
+class RequestProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = request.profile = RequestProfile()
+        with connections['default'].execute_wrapper(profile):
+            response = self.get_response(request)
+
+        profile.total_time = time.perf_counter() - profile.start
+        if profile.view is None:
+            match = getattr(request, 'resolver_match', None)
+            profile.view = match.view_name if match else request.path
+        stats.add(profile)
+        response['Server-Timing'] = profile.server_timing()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.profile.view = request.resolver_match.view_name
+
+    def process_template_response(self, request, response):
+        # TemplateResponse renders after the view returns; time that call.
+        render = response.render
+
+        def timed_render():
+            start = time.perf_counter()
+            try:
+                return render()
+            finally:
+                request.profile.template_time += time.perf_counter() - start
+
+        response.render = timed_render
+        return response
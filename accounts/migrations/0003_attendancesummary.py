@@ -0,0 +1,51 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def build_summaries(apps, schema_editor):
+    AttendanceSummary = apps.get_model('accounts', 'AttendanceSummary')
+    StudentAttendance = apps.get_model('accounts', 'StudentAttendance')
+    TotalClassCount = apps.get_model('accounts', 'TotalClassCount')
+
+    totals = {}
+    for row in TotalClassCount.objects.values('user', 'subject').annotate(total=Sum('total_class_count')).order_by():
+        totals.setdefault((row['user'], row['subject']), [0, 0])[0] = row['total']
+    present = StudentAttendance.objects.filter(status='Present')
+    for row in present.values('user', 'subject').annotate(total=Count('id')).order_by():
+        totals.setdefault((row['user'], row['subject']), [0, 0])[1] = row['total']
+
+    AttendanceSummary.objects.bulk_create(
+        [
+            AttendanceSummary(user_id=user_id, subject_id=subject_id, total_classes=classes, total_present=present)
+            for (user_id, subject_id), (classes, present) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_manager'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_classes', models.IntegerField(default=0)),
+                ('total_present', models.IntegerField(default=0)),
+                ('subject', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='accounts.subject')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'subject'), name='unique_attendance_summary_per_subject')],
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_attendancesummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField()),
+                ('class_list', models.CharField(max_length=10)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('year', 'class_list'), name='unique_roll_sequence_per_year_class')],
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations, OperationalError
+
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS accounts_user_search "
+    "USING fts5(first_name, last_name, email, role, roll, class_list, tokenize='trigram')",
+    "INSERT INTO accounts_user_search (rowid, first_name, last_name, email, role, roll, class_list) "
+    "SELECT u.id, u.first_name, u.last_name, u.email, u.role, COALESCE(p.roll, ''), COALESCE(p.class_list, '') "
+    "FROM accounts_user u LEFT JOIN accounts_studentprofile p ON p.user_id = u.id",
+]
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS accounts_user_search",
+]
+
+# Match the UPPER(col::text) LIKE UPPER(...) that icontains generates
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS accounts_user_first_name_trgm ON accounts_user USING gin (UPPER(first_name::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS accounts_user_last_name_trgm ON accounts_user USING gin (UPPER(last_name::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS accounts_user_email_trgm ON accounts_user USING gin (UPPER(email::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS accounts_studentprofile_roll_trgm ON accounts_studentprofile USING gin (UPPER(roll::text) gin_trgm_ops)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS accounts_user_first_name_trgm",
+    "DROP INDEX IF EXISTS accounts_user_last_name_trgm",
+    "DROP INDEX IF EXISTS accounts_user_email_trgm",
+    "DROP INDEX IF EXISTS accounts_studentprofile_roll_trgm",
+]
+
+
+def trigram_available(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'postgresql' and not trigram_available(schema_editor.connection):
+            # contrib not installed: icontains still works, just unindexed
+            return
+        try:
+            for sql in statements.get(vendor, []):
+                schema_editor.execute(sql)
+        except OperationalError:
+            # SQLite built without FTS5/trigram: search falls back to icontains
+            if vendor != 'sqlite':
+                raise
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_rollsequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='roll',
+            field=models.CharField(db_index=True, max_length=10),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_studentprofile_roll_index'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentattendance',
+            index=models.Index(fields=['-created_at', '-id'], name='attendance_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentattendance',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='attendance_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentprofile',
+            index=models.Index(fields=['class_list', 'roll'], name='profile_class_roll_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentresult',
+            index=models.Index(fields=['-year', 'semester', 'id', 'cgpa'], name='result_year_semester_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentresult',
+            index=models.Index(fields=['user', '-year', 'semester', 'id'], name='result_user_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='totalclasscount',
+            index=models.Index(fields=['user', 'subject', 'total_class_count'], name='totalclass_user_subject_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', '-date_joined', '-id'], name='user_role_joined_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentattendance',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='studentresult',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='studentattendance',
+            index=models.Index(fields=['user', 'updated_at'], name='attendance_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentresult',
+            index=models.Index(fields=['user', 'updated_at'], name='result_user_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Avg, Count, Max
+
+
+def build_standings(apps, schema_editor):
+    SemesterStanding = apps.get_model('accounts', 'SemesterStanding')
+    StudentResult = apps.get_model('accounts', 'StudentResult')
+
+    groups = {}
+    stats = StudentResult.objects.values('user', 'year', 'semester').annotate(
+        average=Avg('cgpa'),
+        subject_count=Count('id'),
+        class_list=Max('user__studentprofile__class_list'),
+    ).order_by()
+    for row in stats:
+        groups.setdefault((row['year'], row['semester'], row['class_list'] or ''), []).append(row)
+
+    standings = []
+    for (year, semester, class_list), rows in groups.items():
+        rows.sort(key=lambda row: (-row['average'], row['user']))
+        rank = 0
+        for position, row in enumerate(rows, start=1):
+            if position == 1 or row['average'] != rows[position - 2]['average']:
+                rank = position
+            standings.append(SemesterStanding(
+                user_id=row['user'],
+                year=year,
+                semester=semester,
+                class_list=class_list,
+                average=row['average'],
+                subject_count=row['subject_count'],
+                rank=rank,
+            ))
+    SemesterStanding.objects.bulk_create(standings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SemesterStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.CharField(max_length=50)),
+                ('semester', models.CharField(max_length=50)),
+                ('class_list', models.CharField(max_length=10)),
+                ('average', models.FloatField()),
+                ('subject_count', models.IntegerField(default=0)),
+                ('rank', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['year', 'semester', 'class_list', 'rank'], name='standing_class_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'year', 'semester'), name='unique_standing_per_semester')],
+            },
+        ),
+        migrations.RunPython(build_standings, migrations.RunPython.noop),
+    ]
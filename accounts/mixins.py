@@ -1,11 +1,275 @@
+import base64
+import datetime
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 from django.contrib.auth.mixins import AccessMixin
+from . import caching
+from . import roles
+from . import search
+
+class LoginRequiredMixin(AccessMixin):
+    """
+    Like Django's LoginRequiredMixin, but answered from the session role
+    snapshot so it doesn't load the user.
+    """
+    def dispatch(self, request, *args, **kwargs):
+        if not roles.get_snapshot(request).is_authenticated:
+            return self.handle_no_permission()
+        return super().dispatch(request, *args, **kwargs)
+
 
 class StaffRequiredMixin(AccessMixin):
     """
-    Redirect non-staff users to home page
+    Send anonymous users to the login page and non-staff users home
     """
     def dispatch(self, request, *args, **kwargs):
-        if not request.user.is_authenticated and not request.user.is_staff:
+        snapshot = roles.get_snapshot(request)
+        if not snapshot.is_authenticated:
+            return self.handle_no_permission()
+        if not snapshot.is_staff:
             return redirect("home")
         return super().dispatch(request, *args, **kwargs)
+
+
+class StudentRecordFilterMixin:
+    """
+    Shared query string filters for per-student records (results,
+    attendance) so list pages and their exports always agree.
+    """
+    # GET parameter -> ORM lookup
+    filter_lookups = {
+        'class': 'user__studentprofile__class_list',
+    }
+    # Optional form cleaning some of those parameters; values it rejects
+    # (a year of "abc") are ignored rather than handed to the ORM
+    filter_form_class = None
+
+    def get_filter_values(self):
+        values = {param: self.request.GET.get(param) for param in self.filter_lookups}
+        if self.filter_form_class:
+            form = self.filter_form_class(self.request.GET)
+            form.is_valid()
+            for name in form.fields:
+                values[name] = form.cleaned_data.get(name)
+        return values
+
+    def filter_records(self, queryset):
+        snapshot = roles.get_snapshot(self.request)
+        if snapshot.role == 'Student':
+            queryset = queryset.filter(user_id=snapshot.id)
+
+        values = self.get_filter_values()
+        for param, lookup in self.filter_lookups.items():
+            value = values.get(param)
+            if value not in (None, ''):
+                queryset = queryset.filter(**{lookup: value})
+
+        term = self.request.GET.get('search')
+        if term:
+            queryset = search.search_users(
+                queryset,
+                term,
+                columns=('first_name', 'last_name', 'email', 'roll'),
+                path='user',
+            )
+        return queryset
+
+
+class KeysetPaginationMixin:
+    """
+    Cursor based pagination for ListViews.
+
+    Pages are fetched by seeking past the last row of the previous page on
+    ``cursor_fields`` instead of using OFFSET, so deep pages cost the same as
+    the first one. The last field must be unique (normally ``id``).
+    """
+    paginate_by = 50
+    cursor_fields = ('-id',)
+    cursor_param = 'cursor'
+    direction_param = 'direction'
+
+    def get_cursor_fields(self):
+        return self.cursor_fields
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, field.lstrip('-')) for field in self.get_cursor_fields()]
+        # DjangoJSONEncoder cuts datetimes to milliseconds, which would skip
+        # the rest of the rows created in the same millisecond (bulk inserts)
+        values = [
+            value.isoformat() if isinstance(value, (datetime.datetime, datetime.time)) else value
+            for value in values
+        ]
+        data = json.dumps(values, cls=DjangoJSONEncoder).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, cursor, model):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            fields = self.get_cursor_fields()
+            if len(values) != len(fields):
+                raise ValueError
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(fields, values)
+            ]
+        except Exception:
+            raise Http404("Invalid cursor.")
+
+    def seek_filter(self, values, reverse=False):
+        """
+        Build ``(a, b, c) > (x, y, z)`` as nested ORs, honouring each field's
+        own direction so mixed orderings like ``-year, semester`` work.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.get_cursor_fields(), values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def seek_queryset(self, queryset, page_size):
+        """
+        The (unevaluated) query for the requested page plus one row, which
+        tells whether there is a page after it.
+        """
+        fields = self.get_cursor_fields()
+        cursor = self.request.GET.get(self.cursor_param)
+        backwards = self.request.GET.get(self.direction_param) == 'previous'
+
+        if backwards:
+            ordering = [f[1:] if f.startswith('-') else f'-{f}' for f in fields]
+        else:
+            ordering = list(fields)
+        queryset = queryset.order_by(*ordering)
+
+        if cursor:
+            values = self.decode_cursor(cursor, queryset.model)
+            queryset = queryset.filter(self.seek_filter(values, reverse=backwards))
+        return queryset[:page_size + 1]
+
+    def paginate_queryset(self, queryset, page_size):
+        return self.paginate_rows(list(self.seek_queryset(queryset, page_size)), page_size)
+
+    def paginate_rows(self, rows, page_size):
+        """
+        Turn the rows fetched from ``seek_queryset`` into the page and set
+        the next/previous cursors.
+        """
+        cursor = self.request.GET.get(self.cursor_param)
+        backwards = self.request.GET.get(self.direction_param) == 'previous'
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+
+        has_next = has_more if not backwards else bool(cursor)
+        has_previous = has_more if backwards else bool(cursor)
+
+        self.next_cursor = self.encode_cursor(rows[-1]) if rows and has_next else None
+        self.previous_cursor = self.encode_cursor(rows[0]) if rows and has_previous else None
+
+        return (None, None, rows, has_next or has_previous)
+
+    def get_page_query(self, cursor, direction):
+        params = self.request.GET.copy()
+        params[self.cursor_param] = cursor
+        params[self.direction_param] = direction
+        return params.urlencode()
+
+    def get_pagination_context(self):
+        next_cursor = getattr(self, 'next_cursor', None)
+        previous_cursor = getattr(self, 'previous_cursor', None)
+        return {
+            'next_cursor': next_cursor,
+            'previous_cursor': previous_cursor,
+            'next_page_query': self.get_page_query(next_cursor, 'next') if next_cursor else '',
+            'previous_page_query': self.get_page_query(previous_cursor, 'previous') if previous_cursor else '',
+        }
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_pagination_context())
+        return context
+
+
+class CachedResponseMixin:
+    """
+    Cache the rendered GET response per session.
+
+    The key includes the versions of ``get_cache_namespaces()`` and of the
+    viewer's own user record, so the signals that bump those versions
+    retire every cached copy at once.
+    """
+    cache_timeout = 60 * 15
+
+    def get_cache_namespaces(self):
+        """
+        Version namespaces the page depends on, or None to not cache it.
+        """
+        return None
+
+    def get_cache_key(self, namespaces):
+        snapshot = roles.get_snapshot(self.request)
+        return self.page_key(caching.version_token(caching.user_namespace(snapshot.id), *namespaces))
+
+    async def aget_cache_key(self, namespaces):
+        snapshot = await roles.aget_snapshot(self.request)
+        return self.page_key(await caching.aversion_token(caching.user_namespace(snapshot.id), *namespaces))
+
+    def page_key(self, token):
+        path = hashlib.md5(self.request.get_full_path().encode()).hexdigest()
+        return ':'.join(['accounts', 'page', self.request.session.session_key, token, path])
+
+    def get(self, request, *args, **kwargs):
+        namespaces = self.get_cache_namespaces()
+        if namespaces is None or not request.session.session_key:
+            return super().get(request, *args, **kwargs)
+
+        key = self.get_cache_key(namespaces)
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(key, rendered.content, self.cache_timeout)
+            )
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Answer GETs with 304 Not Modified when the validators from
+    ``get_validators()`` match what the browser already has.
+    """
+    def get_validators(self):
+        """
+        Return ``(etag, last_modified)``; ``(None, None)`` skips the check.
+        """
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag is None and last_modified is None:
+            return super().get(request, *args, **kwargs)
+
+        view = condition(
+            etag_func=lambda request, *args, **kwargs: etag,
+            last_modified_func=lambda request, *args, **kwargs: last_modified,
+        )(super().get)
+        response = view(request, *args, **kwargs)
+        # Let the browser keep the page but always check back first
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
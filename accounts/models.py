@@ -1,7 +1,40 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as BaseUserManager
 from django.utils import timezone
-from django.db.models import Sum
+from django.db.models import Avg, Sum, Count, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from . import roles
+
+
+def total_classes_subquery(user_ref):
+    # One correlated SUM per row instead of a query per row in Python
+    totals = TotalClassCount.objects.filter(
+        user=OuterRef(user_ref)
+    ).order_by().values('user').annotate(
+        total=Sum('total_class_count')
+    ).values('total')
+    return Coalesce(Subquery(totals), Value(0))
+
+
+class UserQuerySet(models.QuerySet):
+    def with_total_classes(self):
+        return self.annotate(total_classes=total_classes_subquery('pk'))
+
+    def update(self, **kwargs):
+        # save() invalidates role snapshots from a signal; update() sends
+        # none, so a bulk demotion or deactivation does it here
+        if roles.SNAPSHOT_FIELDS.isdisjoint(kwargs):
+            return super().update(**kwargs)
+        user_ids = list(self.values_list('pk', flat=True))
+        rows = super().update(**kwargs)
+        for user_id in user_ids:
+            roles.invalidate(user_id)
+        return rows
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    pass
 
 
 class User(AbstractUser):
@@ -17,6 +50,14 @@ class User(AbstractUser):
         ("Accounts", "Accounts"),
     }
     role = models.CharField(choices=ROLE_CHOICES, max_length=20, default='student')
+
+    objects = UserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Student list: role filter, newest first
+            models.Index(fields=['role', '-date_joined', '-id'], name='user_role_joined_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         if self.is_superuser:
@@ -27,6 +68,12 @@ class User(AbstractUser):
 
     @property
     def total_classes_count(self):
+        # Prefer a value attached by with_total_classes() or prefetch_related()
+        if 'total_classes' in self.__dict__:
+            return self.total_classes or 0
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if 'totalclasses' in prefetched:
+            return sum(row.total_class_count for row in prefetched['totalclasses'])
         # Use the related_name 'totalclasses' from TotalClassCount
         return self.totalclasses.aggregate(total=Sum('total_class_count'))['total'] or 0
     
@@ -45,13 +92,66 @@ class StudentProfile(models.Model):
     CLASS_CHOICES = [(str(i), str(i)) for i in range(0, 11)]
     class_list = models.CharField(choices=CLASS_CHOICES, max_length=10, default='1')
     
-    roll = models.CharField(max_length=10)
+    roll = models.CharField(max_length=10, db_index=True)
+    
+    class Meta:
+        indexes = [
+            # Class filters and class rosters ordered by roll
+            models.Index(fields=['class_list', 'roll'], name='profile_class_roll_idx'),
+        ]
     
+    @staticmethod
+    def make_roll(year, class_list, number):
+        return f'{year}{class_list}{number}'
     
     def __str__(self):
         return self.roll
     
 
+class RollSequenceManager(models.Manager):
+    def allocate(self, year, class_list, count=1):
+        """
+        Reserve ``count`` consecutive roll numbers for a (year, class) and
+        return the first one. Call inside the transaction that saves the
+        profiles so a rollback gives the numbers back.
+        """
+        sequence = self.filter(year=year, class_list=class_list)
+        with transaction.atomic():
+            # UPDATE first: it takes the row (or SQLite write) lock before we read
+            if not sequence.update(last_value=F('last_value') + count):
+                try:
+                    with transaction.atomic():
+                        self.create(year=year, class_list=class_list, last_value=count)
+                    return 1
+                except IntegrityError:
+                    # Created by a concurrent enrollment in the meantime
+                    sequence.update(last_value=F('last_value') + count)
+            last_value = sequence.select_for_update().values_list('last_value', flat=True).get()
+        return last_value - count + 1
+
+
+class RollSequence(models.Model):
+    """
+    Last roll number handed out per (year, class).
+    """
+    year = models.PositiveIntegerField()
+    class_list = models.CharField(max_length=10)
+    last_value = models.PositiveIntegerField(default=0)
+
+    objects = RollSequenceManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['year', 'class_list'],
+                name='unique_roll_sequence_per_year_class'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.year}/{self.class_list}: {self.last_value}"
+    
+
 class StudentResult(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     roll = models.ForeignKey(StudentProfile, on_delete=models.CASCADE)
@@ -59,6 +159,7 @@ class StudentResult(models.Model):
     semester = models.CharField(max_length=50)
     year = models.CharField(max_length=50)
     cgpa = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         constraints = [
@@ -67,10 +168,23 @@ class StudentResult(models.Model):
                 name='unique_student_semester_subject'
             )
         ]
+        indexes = [
+            # Staff list and buckets: filter/order by -year, semester, then id as tiebreaker
+            models.Index(fields=['-year', 'semester', 'id', 'cgpa'], name='result_year_semester_idx'),
+            # A student's own results in the same order
+            models.Index(fields=['user', '-year', 'semester', 'id'], name='result_user_year_idx'),
+            # Conditional GET validator: count and max(updated_at) per student
+            models.Index(fields=['user', 'updated_at'], name='result_user_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name}"
      
+class StudentAttendanceQuerySet(models.QuerySet):
+    def with_total_classes(self):
+        return self.annotate(total_classes=total_classes_subquery('user'))
+
+
 class StudentAttendance(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     roll = models.ForeignKey(StudentProfile, on_delete=models.CASCADE)
@@ -85,6 +199,9 @@ class StudentAttendance(models.Model):
         default='Absent'
     )
     created_at = models.DateField(default=timezone.localdate)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = StudentAttendanceQuerySet.as_manager()
     
     class Meta:
         constraints = [
@@ -93,6 +210,12 @@ class StudentAttendance(models.Model):
                 name='unique_attendance_per_day_per_subject'
             )
         ]
+        indexes = [
+            # Newest first, with id as tiebreaker for keyset pages
+            models.Index(fields=['-created_at', '-id'], name='attendance_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='attendance_user_created_idx'),
+            models.Index(fields=['user', 'updated_at'], name='attendance_user_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name}"
@@ -104,5 +227,367 @@ class TotalClassCount(models.Model):
     total_class_count = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # Covers SUM(total_class_count) per user and subject without touching the table
+            models.Index(fields=['user', 'subject', 'total_class_count'], name='totalclass_user_subject_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.first_name} {self.user.last_name}"
+    
+
+class AttendanceSummaryQuerySet(models.QuerySet):
+    def adjust(self, user_id, subject_id, classes=0, present=0):
+        """
+        Apply a delta to one (student, subject) row, creating it on first use.
+        """
+        if not classes and not present:
+            return
+        changes = {
+            'total_classes': F('total_classes') + classes,
+            'total_present': F('total_present') + present,
+        }
+        if self.filter(user_id=user_id, subject_id=subject_id).update(**changes):
+            return
+        # Nothing to subtract from; the next rebuild will settle the row
+        if classes < 0 or present < 0:
+            return
+        try:
+            with transaction.atomic():
+                self.create(
+                    user_id=user_id,
+                    subject_id=subject_id,
+                    total_classes=classes,
+                    total_present=present,
+                )
+        except IntegrityError:
+            # Another request created the row first
+            self.filter(user_id=user_id, subject_id=subject_id).update(**changes)
+
+    def rebuild(self, users=None, subject=None):
+        """
+        Recompute summaries from StudentAttendance and TotalClassCount, either
+        for everyone or only for the given users and/or subject.
+        """
+        attendance = StudentAttendance.objects.filter(status='Present')
+        classes = TotalClassCount.objects.all()
+        summaries = self.all()
+
+        if users is not None:
+            attendance = attendance.filter(user__in=users)
+            classes = classes.filter(user__in=users)
+            summaries = summaries.filter(user__in=users)
+        if subject is not None:
+            attendance = attendance.filter(subject=subject)
+            classes = classes.filter(subject=subject)
+            summaries = summaries.filter(subject=subject)
+
+        totals = {}
+        for row in classes.values('user', 'subject').annotate(total=Sum('total_class_count')).order_by():
+            totals.setdefault((row['user'], row['subject']), [0, 0])[0] = row['total']
+        for row in attendance.values('user', 'subject').annotate(total=Count('id')).order_by():
+            totals.setdefault((row['user'], row['subject']), [0, 0])[1] = row['total']
+
+        with transaction.atomic():
+            summaries.delete()
+            self.bulk_create(
+                [
+                    AttendanceSummary(
+                        user_id=user_id,
+                        subject_id=subject_id,
+                        total_classes=total_classes,
+                        total_present=total_present,
+                    )
+                    for (user_id, subject_id), (total_classes, total_present) in totals.items()
+                ],
+                batch_size=1000,
+            )
+
+    def totals_for(self, user):
+        return self._totals(self.filter(user=user).aggregate(
+            total_classes=Sum('total_classes'),
+            total_present=Sum('total_present'),
+        ))
+
+    async def atotals_for(self, user):
+        return self._totals(await self.filter(user=user).aaggregate(
+            total_classes=Sum('total_classes'),
+            total_present=Sum('total_present'),
+        ))
+
+    def _totals(self, totals):
+        total_classes = totals['total_classes'] or 0
+        total_present = totals['total_present'] or 0
+        percentage = round(total_present * 100 / total_classes, 1) if total_classes else 0
+        return {
+            'total_classes': total_classes,
+            'total_present': total_present,
+            'attendance_percentage': percentage,
+        }
+
+
+class AttendanceSummary(models.Model):
+    """
+    Denormalized attendance totals per student and subject, kept up to date
+    by the signals in accounts/signals.py.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="attendance_summaries")
+    subject = models.ForeignKey(Subject, null=True, blank=True, on_delete=models.CASCADE)
+    total_classes = models.IntegerField(default=0)
+    total_present = models.IntegerField(default=0)
+
+    objects = AttendanceSummaryQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'subject'],
+                name='unique_attendance_summary_per_subject'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.subject}"
+
+
+def competition_ranks(averages):
+    """
+    Ranks for averages sorted best first, with ties sharing a rank
+    (1, 2, 2, 4).
+    """
+    ranks = []
+    for position, average in enumerate(averages, start=1):
+        ranks.append(ranks[-1] if ranks and average == averages[position - 2] else position)
+    return ranks
+
+
+class SemesterStandingQuerySet(models.QuerySet):
+    def _semester_stats(self, results):
+        return results.values('user', 'year', 'semester').annotate(
+            average=Avg('cgpa'),
+            subject_count=Count('id'),
+            class_list=Max('user__studentprofile__class_list'),
+        ).order_by()
+
+    def rerank(self, year, semester, class_list):
+        """
+        Re-rank one class for one semester, writing only rows whose rank
+        moved. Returns the ids of those students.
+        """
+        rows = list(
+            self.filter(year=year, semester=semester, class_list=class_list)
+            .order_by('-average', 'user_id')
+            .only('id', 'user_id', 'average', 'rank')
+        )
+        moved = []
+        for row, rank in zip(rows, competition_ranks([row.average for row in rows])):
+            if row.rank != rank:
+                row.rank = rank
+                moved.append(row)
+        self.bulk_update(moved, ['rank'], batch_size=500)
+        return {row.user_id for row in moved}
+
+    def refresh(self, user_ids, year, semester):
+        """
+        Recompute the given students' standings for one semester from
+        StudentResult and re-rank their classes. Returns the ids of every
+        student whose row changed, classmates included.
+        """
+        user_ids = set(user_ids)
+        results = StudentResult.objects.filter(user__in=user_ids, year=year, semester=semester)
+        stats = list(self._semester_stats(results))
+        # A student who changed class leaves a gap in the old one too
+        classes = set(
+            self.filter(year=year, semester=semester, user__in=user_ids).values_list('class_list', flat=True)
+        ) | {row['class_list'] or '' for row in stats}
+
+        with transaction.atomic():
+            # Deleting sends post_delete, which re-ranks the class left behind
+            self.filter(year=year, semester=semester, user__in=user_ids - {row['user'] for row in stats}).delete()
+            self.bulk_create(
+                [
+                    SemesterStanding(
+                        user_id=row['user'],
+                        year=year,
+                        semester=semester,
+                        class_list=row['class_list'] or '',
+                        average=row['average'],
+                        subject_count=row['subject_count'],
+                    )
+                    for row in stats
+                ],
+                update_conflicts=True,
+                unique_fields=['user', 'year', 'semester'],
+                update_fields=['class_list', 'average', 'subject_count'],
+            )
+            changed = set(user_ids)
+            for class_list in classes:
+                changed |= self.rerank(year, semester, class_list)
+        return changed
+
+    def rebuild(self):
+        """
+        Recompute every standing from scratch. Returns the ids of the
+        students whose standings changed.
+        """
+        groups = {}
+        for row in self._semester_stats(StudentResult.objects.all()):
+            groups.setdefault((row['year'], row['semester'], row['class_list'] or ''), []).append(row)
+
+        standings = []
+        for (year, semester, class_list), rows in groups.items():
+            rows.sort(key=lambda row: (-row['average'], row['user']))
+            for row, rank in zip(rows, competition_ranks([row['average'] for row in rows])):
+                standings.append(SemesterStanding(
+                    user_id=row['user'],
+                    year=year,
+                    semester=semester,
+                    class_list=class_list,
+                    average=row['average'],
+                    subject_count=row['subject_count'],
+                    rank=rank,
+                ))
+
+        added = {
+            (standing.user_id, standing.year, standing.semester):
+                (standing.class_list, standing.average, standing.subject_count, standing.rank)
+            for standing in standings
+        }
+        stale = []
+        changed = set()
+        rows = self.values_list('pk', 'user_id', 'year', 'semester', 'class_list', 'average', 'subject_count', 'rank')
+        for pk, user_id, year, semester, *values in rows.iterator():
+            new = added.pop((user_id, year, semester), None)
+            if new is None:
+                stale.append(pk)
+            if tuple(values) != new:
+                changed.add(user_id)
+        # Whatever is left in ``added`` is a new standing
+        changed.update(user_id for user_id, year, semester in added)
+
+        with transaction.atomic():
+            self.bulk_create(
+                standings,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['user', 'year', 'semester'],
+                update_fields=['class_list', 'average', 'subject_count', 'rank'],
+            )
+            for start in range(0, len(stale), 500):
+                self.filter(pk__in=stale[start:start + 500]).delete()
+        return changed
+
+
+class SemesterStanding(models.Model):
+    """
+    Semester GPA and class rank per student, materialized from StudentResult
+    and kept up to date by the signals in accounts/signals.py.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="standings")
+    year = models.CharField(max_length=50)
+    semester = models.CharField(max_length=50)
+    # The student's class when the standing was last computed
+    class_list = models.CharField(max_length=10)
+    average = models.FloatField()
+    subject_count = models.IntegerField(default=0)
+    rank = models.IntegerField(default=0)
+
+    objects = SemesterStandingQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'year', 'semester'],
+                name='unique_standing_per_semester'
+            )
+        ]
+        indexes = [
+            # Leaderboards: one class and semester in rank order
+            models.Index(fields=['year', 'semester', 'class_list', 'rank'], name='standing_class_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.year} {self.semester}"
+
+
+class JobQuerySet(models.QuerySet):
+    def claim(self, worker):
+        """
+        Mark the oldest due job as running for ``worker`` and return it, or
+        None when nothing is due. The status check in the UPDATE makes the
+        claim safe with several workers polling the same table.
+        """
+        now = timezone.now()
+        due = self.filter(status='Queued', run_at__lte=now).order_by('run_at', 'id')
+        for job_id in due.values_list('id', flat=True)[:10]:
+            claimed = self.filter(pk=job_id, status='Queued').update(
+                status='Running',
+                worker=worker,
+                started_at=now,
+                attempts=F('attempts') + 1,
+            )
+            if claimed:
+                return self.get(pk=job_id)
+        return None
+
+    def requeue_stale(self, started_before):
+        """
+        Put back jobs left running by a worker that died.
+        """
+        return self.filter(status='Running', started_at__lt=started_before).update(
+            status='Queued',
+            worker='',
+            run_at=timezone.now(),
+        )
+
+
+class Job(models.Model):
+    """
+    A task queued from a view and run by the ``run_worker`` command; see
+    accounts/tasks.py.
+    """
+    STATUS_CHOICES = (
+        ("Queued", "Queued"),
+        ("Running", "Running"),
+        ("Succeeded", "Succeeded"),
+        ("Failed", "Failed"),
+    )
+
+    name = models.CharField(max_length=100)
+    arguments = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Queued')
+    progress = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    worker = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="jobs")
+    created_at = models.DateTimeField(auto_now_add=True)
+    run_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Workers poll for the oldest due job
+            models.Index(fields=['status', 'run_at', 'id'], name='job_status_run_at_idx'),
+        ]
+
+    @property
+    def is_finished(self):
+        return self.status in ('Succeeded', 'Failed')
+
+    @property
+    def percent(self):
+        if not self.total:
+            return None
+        return min(100, self.progress * 100 // self.total)
+
     def __str__(self):
-        return f"{self.user.first_name} {self.user.last_name}"
\ No newline at end of file
+        return f"{self.name} #{self.pk} ({self.status})"
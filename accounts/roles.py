@@ -0,0 +1,139 @@
+"""
+Role snapshots, so authorization checks don't load the User row.
+
+At login the user's role and staff flags are stored in the session along
+with the user's version counter (see ``caching``). Later requests compare
+that version against the cache and only fall back to ``request.user`` (a
+database query) when the user has been saved since, which bumps the
+version. Snapshots are also cached per user and version, so a user's other
+sessions refresh without a query too.
+
+That only holds when every process sees the same version counters, so
+production needs a shared cache; ``check --deploy`` fails on the
+per-process local-memory cache.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY as USER_SESSION_KEY
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from . import caching
+
+
+SESSION_KEY = '_accounts_role'
+ROLE_TIMEOUT = 60 * 60 * 24
+# User fields a snapshot depends on; changing any of them must invalidate it
+SNAPSHOT_FIELDS = frozenset({'role', 'is_staff', 'is_superuser', 'is_active', 'password'})
+
+
+class RoleSnapshot:
+    def __init__(self, id=None, role='Guest', is_staff=False, is_superuser=False, session_hash='', version=None):
+        self.id = id
+        self.role = role
+        self.is_staff = is_staff
+        self.is_superuser = is_superuser
+        self.session_hash = session_hash
+        self.version = version
+
+    @property
+    def is_authenticated(self):
+        return self.id is not None
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+ANONYMOUS = RoleSnapshot()
+
+
+def invalidate(user_id):
+    caching.bump_version(caching.user_namespace(user_id))
+
+
+def remember(request, user):
+    """
+    Store a fresh snapshot of ``user`` in the session and the cache.
+    """
+    namespace = caching.user_namespace(user.pk)
+    snapshot = RoleSnapshot(
+        id=user.pk,
+        role=user.role or 'Guest',
+        is_staff=user.is_staff,
+        is_superuser=user.is_superuser,
+        session_hash=user.get_session_auth_hash(),
+        version=caching.get_version(namespace),
+    )
+    cache.set(caching.versioned_key(namespace, 'role'), snapshot.as_dict(), ROLE_TIMEOUT)
+    request.session[SESSION_KEY] = snapshot.as_dict()
+    request._role_snapshot = snapshot
+    return snapshot
+
+
+def _resolve(request):
+    user_id = request.session.get(USER_SESSION_KEY)
+    if user_id is None:
+        return ANONYMOUS
+
+    namespace = caching.user_namespace(user_id)
+    version = caching.get_version(namespace)
+    data = request.session.get(SESSION_KEY)
+    if not data or str(data['id']) != str(user_id) or data['version'] != version:
+        data = cache.get(caching.versioned_key(namespace, 'role'))
+
+    # The hash check is what logs out other sessions after a password change
+    session_hash = request.session.get(HASH_SESSION_KEY, '')
+    if data and constant_time_compare(data['session_hash'], session_hash):
+        if request.session.get(SESSION_KEY) != data:
+            request.session[SESSION_KEY] = data
+        return RoleSnapshot(**data)
+
+    # Stale or unknown: let Django's session auth load and verify the user
+    if not request.user.is_authenticated:
+        return ANONYMOUS
+    return remember(request, request.user)
+
+
+async def _aresolve(request):
+    # Same steps as _resolve, through the async session and cache APIs
+    user_id = await request.session.aget(USER_SESSION_KEY)
+    if user_id is None:
+        return ANONYMOUS
+
+    namespace = caching.user_namespace(user_id)
+    version = await caching.aget_version(namespace)
+    data = await request.session.aget(SESSION_KEY)
+    if not data or str(data['id']) != str(user_id) or data['version'] != version:
+        data = await cache.aget(await caching.aversioned_key(namespace, 'role'))
+
+    session_hash = await request.session.aget(HASH_SESSION_KEY, '')
+    if data and constant_time_compare(data['session_hash'], session_hash):
+        if await request.session.aget(SESSION_KEY) != data:
+            await request.session.aset(SESSION_KEY, data)
+        return RoleSnapshot(**data)
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        return ANONYMOUS
+    return await sync_to_async(remember)(request, user)
+
+
+def get_snapshot(request):
+    if not hasattr(request, '_role_snapshot'):
+        request._role_snapshot = _resolve(request)
+    return request._role_snapshot
+
+
+async def aget_snapshot(request):
+    """
+    ``get_snapshot`` for async views. The result is kept on the request, so
+    the ``access`` context processor reuses it while rendering.
+    """
+    if not hasattr(request, '_role_snapshot'):
+        request._role_snapshot = await _aresolve(request)
+    return request._role_snapshot
+
+
+def access(request):
+    """
+    Context processor exposing the snapshot to templates as ``access``.
+    """
+    return {'access': get_snapshot(request)}
@@ -0,0 +1,104 @@
+"""
+Indexed user lookup for the list page search boxes.
+
+SQLite gets an FTS5 table with the trigram tokenizer, which answers the
+same substring matches as ``icontains`` from an index. PostgreSQL gets
+pg_trgm GIN indexes on ``UPPER(column)`` (see migration 0005_user_search_index) so the
+plain ``icontains`` query is already indexed there.
+"""
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from . import models
+
+
+SEARCH_TABLE = 'accounts_user_search'
+SEARCH_COLUMNS = ('first_name', 'last_name', 'email', 'role', 'roll', 'class_list')
+
+# Trigram matching needs at least three characters
+MIN_TERM_LENGTH = 3
+
+# Where each indexed column lives, relative to User
+COLUMN_LOOKUPS = {
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'email': 'email',
+    'role': 'role',
+    'roll': 'studentprofile__roll',
+    'class_list': 'studentprofile__class_list',
+}
+
+_index_available = {}
+
+
+def create_index_sql():
+    columns = ', '.join(SEARCH_COLUMNS)
+    return f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5({columns}, tokenize='trigram')"
+
+
+def populate_index_sql(where=''):
+    user_table = models.User._meta.db_table
+    profile_table = models.StudentProfile._meta.db_table
+    return (
+        f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+        f"SELECT u.id, u.first_name, u.last_name, u.email, u.role, "
+        f"COALESCE(p.roll, ''), COALESCE(p.class_list, '') "
+        f"FROM {user_table} u LEFT JOIN {profile_table} p ON p.user_id = u.id {where}"
+    )
+
+
+def index_available():
+    if connection.vendor != 'sqlite':
+        return False
+    if connection.alias not in _index_available:
+        _index_available[connection.alias] = SEARCH_TABLE in connection.introspection.table_names()
+    return _index_available[connection.alias]
+
+
+def index_users(user_ids=None, batch_size=500):
+    """
+    Refresh the index rows of the given users, or of everyone.
+    """
+    if not index_available():
+        return
+    with connection.cursor() as cursor:
+        if user_ids is None:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(populate_index_sql())
+            return
+        user_ids = list(user_ids)
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", batch)
+            cursor.execute(populate_index_sql(f"WHERE u.id IN ({placeholders})"), batch)
+
+
+def remove_users(user_ids):
+    if not index_available():
+        return
+    user_ids = list(user_ids)
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", user_ids)
+
+
+def search_users(queryset, term, columns=SEARCH_COLUMNS, path=''):
+    """
+    Filter ``queryset`` to users matching ``term`` in any of ``columns``.
+    ``path`` is the relation from the queryset's model to User ('' when the
+    queryset is over User itself, 'user' for results and attendance).
+    """
+    term = term.strip()
+    prefix = f'{path}__' if path else ''
+
+    if index_available() and len(term) >= MIN_TERM_LENGTH:
+        phrase = '"' + term.replace('"', '""') + '"'
+        match = '{' + ' '.join(columns) + '} : ' + phrase
+        ids = RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match])
+        return queryset.filter(**{f'{path or "pk"}__in': ids})
+
+    condition = Q()
+    for column in columns:
+        condition |= Q(**{f'{prefix}{COLUMN_LOOKUPS[column]}__icontains': term})
+    return queryset.filter(condition)
@@ -0,0 +1,124 @@
+"""
+Synthetic data for load tests and benchmarks. Everything is written with
+bulk_create in batches, so seeding 100k students takes minutes, not hours.
+"""
+import datetime
+import random
+
+from django.db import transaction
+from . import caching
+from . import facets
+from . import models
+from . import search
+
+
+def seed(students=1000, subjects=8, years=2, days=5, batch_size=2000, seed_value=0, stdout=None):
+    rng = random.Random(seed_value)
+    log = stdout.write if stdout else (lambda message: None)
+
+    subject_rows = [
+        models.Subject.objects.get_or_create(subject=f'Subject {number}')[0]
+        for number in range(1, subjects + 1)
+    ]
+    this_year = datetime.date.today().year
+    result_years = [str(this_year - offset) for offset in range(years)]
+    today = datetime.date.today()
+    class_choices = [value for value, label in models.StudentProfile.CLASS_CHOICES]
+
+    start = models.User.objects.count()
+    created = 0
+    while created < students:
+        size = min(batch_size, students - created)
+        with transaction.atomic():
+            users = models.User.objects.bulk_create([
+                models.User(
+                    username=f'seed{start + created + number}',
+                    email=f'seed{start + created + number}@example.com',
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                    role='Student',
+                    password='!',
+                )
+                for number in range(size)
+            ])
+
+            by_class = {}
+            for user in users:
+                by_class.setdefault(rng.choice(class_choices), []).append(user)
+            profiles = []
+            for class_list, class_users in by_class.items():
+                number = models.RollSequence.objects.allocate(this_year, class_list, count=len(class_users))
+                for offset, user in enumerate(class_users):
+                    profiles.append(models.StudentProfile(
+                        user=user,
+                        class_list=class_list,
+                        roll=models.StudentProfile.make_roll(this_year, class_list, number + offset),
+                    ))
+            models.StudentProfile.objects.bulk_create(profiles)
+
+            models.StudentResult.objects.bulk_create(
+                (
+                    models.StudentResult(
+                        user_id=profile.user_id,
+                        roll=profile,
+                        subject=subject,
+                        year=year,
+                        semester=semester,
+                        cgpa=round(rng.uniform(1.0, 4.0), 2),
+                    )
+                    for profile in profiles
+                    for year in result_years
+                    for semester in ('1st', '2nd')
+                    for subject in subject_rows
+                ),
+                batch_size=batch_size,
+            )
+            models.StudentAttendance.objects.bulk_create(
+                (
+                    models.StudentAttendance(
+                        user_id=profile.user_id,
+                        roll=profile,
+                        subject=subject,
+                        status=rng.choices(('Present', 'Absent', 'Late'), weights=(8, 1, 1))[0],
+                        created_at=today - datetime.timedelta(days=day),
+                    )
+                    for profile in profiles
+                    for day in range(days)
+                    for subject in subject_rows
+                ),
+                batch_size=batch_size,
+            )
+            models.TotalClassCount.objects.bulk_create(
+                (
+                    models.TotalClassCount(
+                        user_id=profile.user_id,
+                        at_class=profile.class_list,
+                        subject=subject,
+                        total_class_count=days,
+                    )
+                    for profile in profiles
+                    for subject in subject_rows
+                ),
+                batch_size=batch_size,
+            )
+        created += size
+        log(f"Seeded {created}/{students} students\n")
+
+    # bulk_create skips the signals that keep these in sync
+    models.AttendanceSummary.objects.rebuild()
+    caching.bump_students(models.SemesterStanding.objects.rebuild())
+    search.index_users()
+    facets.invalidate_classes()
+    caching.bump_version(caching.STUDENTS)
+    caching.bump_version(caching.RESULTS)
+    caching.bump_version(caching.ATTENDANCE)
+
+
+FIRST_NAMES = (
+    'Aisha', 'Arif', 'Ben', 'Chen', 'Dana', 'Elif', 'Farhan', 'Grace', 'Hana', 'Ivan',
+    'Jamal', 'Kiran', 'Lina', 'Maya', 'Nabil', 'Omar', 'Priya', 'Rafi', 'Sara', 'Tariq',
+)
+LAST_NAMES = (
+    'Ahmed', 'Brown', 'Chowdhury', 'Das', 'Evans', 'Fischer', 'Garcia', 'Hossain', 'Islam', 'Khan',
+    'Lee', 'Martin', 'Nguyen', 'Okafor', 'Patel', 'Rahman', 'Silva', 'Tanaka', 'Uddin', 'Wang',
+)
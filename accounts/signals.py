@@ -0,0 +1,326 @@
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver, Signal
+from . import caching
+from . import facets
+from . import models
+from . import roles
+from . import search
+
+
+# Sent after attendance rows are written with bulk_create, which skips
+# post_save. Arguments: user_ids, subject.
+attendance_bulk_saved = Signal()
+
+# Sent after result rows are upserted with bulk_create. Arguments:
+# user_ids, year, semester.
+results_bulk_saved = Signal()
+
+
+
+def _attendance_state(user_id, subject_id, status):
+    return (user_id, subject_id, 1 if status == 'Present' else 0)
+
+
+def _class_count_state(user_id, subject_id, total_class_count):
+    return (user_id, subject_id, total_class_count or 0)
+
+
+def _deleted_from(origin):
+    # The model a delete() was called on; every signal in its cascade gets it
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def _student_cascade(origin):
+    """
+    True for rows deleted along with their student (User or StudentProfile).
+    The student's own receivers then update summaries, standings and
+    caches once, instead of once per attendance or result row.
+    """
+    return _deleted_from(origin) in (models.User, models.StudentProfile)
+
+
+# Attendance summary maintenance
+
+@receiver(pre_save, sender=models.StudentAttendance)
+def remember_attendance_state(sender, instance, **kwargs):
+    previous = None
+    if instance.pk:
+        row = sender.objects.filter(pk=instance.pk).values_list('user_id', 'subject_id', 'status').first()
+        if row:
+            previous = _attendance_state(*row)
+    instance._summary_previous = previous
+
+
+@receiver(post_save, sender=models.StudentAttendance)
+def update_summary_for_attendance(sender, instance, **kwargs):
+    previous = getattr(instance, '_summary_previous', None)
+    if previous:
+        user_id, subject_id, present = previous
+        models.AttendanceSummary.objects.adjust(user_id, subject_id, present=-present)
+    user_id, subject_id, present = _attendance_state(instance.user_id, instance.subject_id, instance.status)
+    models.AttendanceSummary.objects.adjust(user_id, subject_id, present=present)
+
+
+@receiver(post_delete, sender=models.StudentAttendance)
+def remove_attendance_from_summary(sender, instance, origin=None, **kwargs):
+    if _student_cascade(origin):
+        return
+    user_id, subject_id, present = _attendance_state(instance.user_id, instance.subject_id, instance.status)
+    models.AttendanceSummary.objects.adjust(user_id, subject_id, present=-present)
+
+
+@receiver(pre_save, sender=models.TotalClassCount)
+def remember_class_count_state(sender, instance, **kwargs):
+    previous = None
+    if instance.pk:
+        row = sender.objects.filter(pk=instance.pk).values_list('user_id', 'subject_id', 'total_class_count').first()
+        if row:
+            previous = _class_count_state(*row)
+    instance._summary_previous = previous
+
+
+@receiver(post_save, sender=models.TotalClassCount)
+def update_summary_for_class_count(sender, instance, **kwargs):
+    previous = getattr(instance, '_summary_previous', None)
+    if previous:
+        user_id, subject_id, classes = previous
+        models.AttendanceSummary.objects.adjust(user_id, subject_id, classes=-classes)
+    user_id, subject_id, classes = _class_count_state(instance.user_id, instance.subject_id, instance.total_class_count)
+    models.AttendanceSummary.objects.adjust(user_id, subject_id, classes=classes)
+
+
+@receiver(post_delete, sender=models.TotalClassCount)
+def remove_class_count_from_summary(sender, instance, origin=None, **kwargs):
+    if _student_cascade(origin):
+        return
+    user_id, subject_id, classes = _class_count_state(instance.user_id, instance.subject_id, instance.total_class_count)
+    models.AttendanceSummary.objects.adjust(user_id, subject_id, classes=-classes)
+
+
+@receiver(pre_delete, sender=models.Subject)
+def remember_subject_students(sender, instance, **kwargs):
+    # Deleting a subject moves its attendance to "no subject" via SET_NULL
+    instance._summary_users = list(
+        models.AttendanceSummary.objects.filter(subject=instance).values_list('user_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=models.Subject)
+def rebuild_summary_for_subject(sender, instance, **kwargs):
+    users = getattr(instance, '_summary_users', None)
+    if users:
+        models.AttendanceSummary.objects.rebuild(users=users)
+
+
+@receiver(attendance_bulk_saved)
+def rebuild_summary_after_bulk_attendance(sender, user_ids, subject, **kwargs):
+    models.AttendanceSummary.objects.rebuild(users=user_ids, subject=subject)
+
+
+# Semester standings
+
+def _refresh_standings(user_ids, year, semester):
+    # Rank changes show on classmates' pages too
+    for user_id in models.SemesterStanding.objects.refresh(user_ids, year, semester):
+        caching.bump_version(caching.student_namespace(user_id))
+
+
+@receiver(pre_save, sender=models.StudentResult)
+def remember_result_semester(sender, instance, **kwargs):
+    previous = None
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).values_list('year', 'semester').first()
+    instance._standing_previous = previous
+
+
+@receiver(post_save, sender=models.StudentResult)
+def update_standing_for_result(sender, instance, **kwargs):
+    semesters = {(instance.year, instance.semester)}
+    previous = getattr(instance, '_standing_previous', None)
+    if previous:
+        semesters.add(previous)
+    for year, semester in semesters:
+        _refresh_standings([instance.user_id], year, semester)
+
+
+@receiver(post_delete, sender=models.StudentResult)
+def update_standing_for_deleted_result(sender, instance, origin=None, **kwargs):
+    if _student_cascade(origin):
+        return
+    _refresh_standings([instance.user_id], instance.year, instance.semester)
+
+
+@receiver(results_bulk_saved)
+def update_standings_after_bulk_results(sender, user_ids, year, semester, **kwargs):
+    _refresh_standings(user_ids, year, semester)
+
+
+@receiver(post_save, sender=models.StudentProfile)
+def update_standings_for_class_change(sender, instance, created, **kwargs):
+    if created:
+        return
+    moved = models.SemesterStanding.objects.filter(user_id=instance.user_id).exclude(class_list=instance.class_list)
+    for year, semester in moved.values_list('year', 'semester'):
+        _refresh_standings([instance.user_id], year, semester)
+
+
+@receiver(post_delete, sender=models.SemesterStanding)
+def rerank_after_standing_deleted(sender, instance, origin=None, **kwargs):
+    if _student_cascade(origin):
+        return
+    moved = models.SemesterStanding.objects.rerank(instance.year, instance.semester, instance.class_list)
+    for user_id in moved:
+        caching.bump_version(caching.student_namespace(user_id))
+
+
+# Deleting a student
+
+@receiver(pre_delete, sender=models.User)
+@receiver(pre_delete, sender=models.StudentProfile)
+def remember_deleted_student_standings(sender, instance, origin=None, **kwargs):
+    if _deleted_from(origin) is not sender:
+        return
+    user_id = instance.pk if sender is models.User else instance.user_id
+    instance._deleted_standings = set(
+        models.SemesterStanding.objects.filter(user_id=user_id).values_list('year', 'semester', 'class_list')
+    )
+
+
+@receiver(post_delete, sender=models.User)
+@receiver(post_delete, sender=models.StudentProfile)
+def update_after_student_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_from(origin) is not sender:
+        return
+    standings = getattr(instance, '_deleted_standings', set())
+    if sender is models.User:
+        # Their summaries and standings went with them; close the gaps they left
+        user_id = instance.pk
+        for year, semester, class_list in standings:
+            caching.bump_students(models.SemesterStanding.objects.rerank(year, semester, class_list))
+    else:
+        # The account stays, without attendance or results
+        user_id = instance.user_id
+        models.AttendanceSummary.objects.rebuild(users=[user_id])
+        for year, semester in {(year, semester) for year, semester, class_list in standings}:
+            _refresh_standings([user_id], year, semester)
+    caching.bump_version(caching.student_namespace(user_id))
+    facets.invalidate_results()
+    caching.bump_version(caching.RESULTS)
+    caching.bump_version(caching.ATTENDANCE)
+
+
+# Search index maintenance
+
+@receiver(post_save, sender=models.User)
+def index_saved_user(sender, instance, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which isn't indexed
+    if update_fields != frozenset({'last_login'}):
+        search.index_users([instance.pk])
+
+
+@receiver(post_delete, sender=models.User)
+def unindex_deleted_user(sender, instance, **kwargs):
+    search.remove_users([instance.pk])
+
+
+@receiver(post_save, sender=models.StudentProfile)
+@receiver(post_delete, sender=models.StudentProfile)
+def index_profile_user(sender, instance, **kwargs):
+    search.index_users([instance.user_id])
+
+
+# Filter dropdown caches
+
+@receiver(post_save, sender=models.StudentResult)
+@receiver(post_delete, sender=models.StudentResult)
+def invalidate_result_facets(sender, origin=None, **kwargs):
+    if _student_cascade(origin):
+        return
+    facets.invalidate_results()
+
+
+@receiver(post_save, sender=models.StudentProfile)
+@receiver(post_delete, sender=models.StudentProfile)
+def invalidate_class_facets(sender, **kwargs):
+    facets.invalidate_classes()
+
+
+# Page and fragment cache versions
+
+@receiver(post_save, sender=models.StudentResult)
+@receiver(post_delete, sender=models.StudentResult)
+def invalidate_result_pages(sender, instance, origin=None, **kwargs):
+    if _student_cascade(origin):
+        return
+    caching.bump_version(caching.student_namespace(instance.user_id))
+    caching.bump_version(caching.RESULTS)
+
+
+@receiver(results_bulk_saved)
+def invalidate_bulk_result_pages(sender, user_ids, **kwargs):
+    facets.invalidate_results()
+    caching.bump_version(caching.RESULTS)
+    for user_id in user_ids:
+        caching.bump_version(caching.student_namespace(user_id))
+
+
+@receiver(post_save, sender=models.StudentAttendance)
+@receiver(post_delete, sender=models.StudentAttendance)
+def invalidate_attendance_pages(sender, instance, origin=None, **kwargs):
+    if _student_cascade(origin):
+        return
+    caching.bump_version(caching.student_namespace(instance.user_id))
+    caching.bump_version(caching.ATTENDANCE)
+
+
+@receiver(post_save, sender=models.TotalClassCount)
+@receiver(post_delete, sender=models.TotalClassCount)
+def invalidate_attendance_reports(sender, origin=None, **kwargs):
+    if _student_cascade(origin):
+        return
+    caching.bump_version(caching.ATTENDANCE)
+
+
+@receiver(attendance_bulk_saved)
+def invalidate_bulk_attendance_pages(sender, user_ids, **kwargs):
+    caching.bump_version(caching.ATTENDANCE)
+    for user_id in user_ids:
+        caching.bump_version(caching.student_namespace(user_id))
+
+
+@receiver(post_save, sender=models.StudentProfile)
+@receiver(post_delete, sender=models.StudentProfile)
+def invalidate_profile_pages(sender, instance, **kwargs):
+    caching.bump_version(caching.student_namespace(instance.user_id))
+    caching.bump_version(caching.STUDENTS)
+
+
+@receiver(post_save, sender=models.User)
+@receiver(post_delete, sender=models.User)
+def invalidate_student_list(sender, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which no cached page shows
+    if update_fields != frozenset({'last_login'}):
+        caching.bump_version(caching.STUDENTS)
+
+
+@receiver(post_save, sender=models.Subject)
+@receiver(post_delete, sender=models.Subject)
+def invalidate_subject_pages(sender, **kwargs):
+    caching.bump_version(caching.SUBJECTS)
+    # Deleting a subject moves its attendance to "no subject"
+    caching.bump_version(caching.ATTENDANCE)
+
+
+# Role snapshots
+
+@receiver(post_save, sender=models.User)
+@receiver(post_delete, sender=models.User)
+def invalidate_role_snapshot(sender, instance, **kwargs):
+    roles.invalidate(instance.pk)
+
+
+@receiver(user_logged_in)
+def remember_role_snapshot(sender, request, user, **kwargs):
+    roles.remember(request, user)
@@ -0,0 +1,145 @@
+"""
+A small database-backed job queue.
+
+Views call ``enqueue(name, **arguments)`` and redirect to the job's status
+page; the ``run_worker`` command claims due jobs from the Job table and
+runs them on a process pool. No broker is needed beyond the database.
+
+A task is a function registered with ``@task`` that takes the Job as its
+first argument and JSON-serialisable keyword arguments. It can report
+progress with ``report_progress(job, ...)`` and returns a
+JSON-serialisable result. Any exception other than TaskError
+is retried with exponential backoff until ``max_attempts`` runs have
+failed. A task's ``on_failure`` callback, called with the same arguments,
+cleans up once the job has failed for good.
+"""
+import datetime
+import os
+import socket
+import traceback
+
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.utils import timezone
+from . import caching
+from . import importers
+from . import models
+
+
+RETRY_DELAY = 30
+
+registry = {}
+
+
+class TaskError(Exception):
+    """
+    Raised by a task to fail its job straight away, without retrying.
+    """
+
+
+def task(name=None, max_attempts=3, on_failure=None):
+    def register(function):
+        function.task_name = name or function.__name__
+        function.max_attempts = max_attempts
+        function.on_failure = on_failure
+        registry[function.task_name] = function
+        return function
+    return register
+
+
+def enqueue(name, user_id=None, **arguments):
+    function = registry[name]
+    return models.Job.objects.create(
+        name=name,
+        arguments=arguments,
+        max_attempts=function.max_attempts,
+        created_by_id=user_id,
+    )
+
+
+def report_progress(job, done, total=None, message=''):
+    # A plain UPDATE, so progress can be written as often as needed
+    changes = {'progress': done, 'message': message[:255]}
+    if total is not None:
+        changes['total'] = total
+    models.Job.objects.filter(pk=job.pk).update(**changes)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def run_job(job_id):
+    """
+    Run one claimed job and record its outcome. Runs inside a pool process.
+    """
+    close_old_connections()
+    job = models.Job.objects.get(pk=job_id)
+    finished = {'worker': worker_name()}
+    try:
+        function = registry.get(job.name)
+        if function is None:
+            raise TaskError(f"Unknown task '{job.name}'.")
+        result = function(job, **job.arguments)
+    except Exception as error:
+        finished['error'] = ''.join(traceback.format_exception(error))
+        if isinstance(error, TaskError) or job.attempts >= job.max_attempts:
+            finished.update(status='Failed', finished_at=timezone.now(), message=str(error)[:255])
+        else:
+            # 30s, 60s, 120s, ...
+            delay = RETRY_DELAY * 2 ** (job.attempts - 1)
+            finished.update(
+                status='Queued',
+                run_at=timezone.now() + datetime.timedelta(seconds=delay),
+                message=f"Attempt {job.attempts} failed; retrying in {delay}s.",
+            )
+    else:
+        finished.update(status='Succeeded', result=result, finished_at=timezone.now(), error='')
+    models.Job.objects.filter(pk=job.pk).update(**finished)
+    if finished['status'] == 'Failed' and function and function.on_failure:
+        function.on_failure(job, **job.arguments)
+    close_old_connections()
+    return finished['status']
+
+
+# Tasks
+
+def delete_upload(job, path, **arguments):
+    default_storage.delete(path)
+
+
+@task(on_failure=delete_upload)
+def import_students(job, path, filename):
+    """
+    Import an uploaded CSV/XLSX file saved under MEDIA_ROOT by
+    StudentImportView. The file is removed once the job has succeeded or
+    failed for good; retries still need it.
+    """
+    def progress(rows_read, report):
+        report_progress(job, rows_read, message=f"{report.created} imported, {len(report.errors)} skipped")
+
+    try:
+        with default_storage.open(path, 'rb') as upload:
+            report = importers.import_students(importers.read_rows(upload, filename), progress=progress)
+    except FileNotFoundError:
+        raise TaskError("The uploaded file is no longer available.")
+    except (UnicodeDecodeError, importers.ImportFileError) as error:
+        raise TaskError(str(error))
+
+    default_storage.delete(path)
+    return {'created': report.created, 'errors': report.errors}
+
+
+@task()
+def rebuild_attendance_summary(job):
+    models.AttendanceSummary.objects.rebuild()
+    caching.bump_version(caching.ATTENDANCE)
+    return {'rows': models.AttendanceSummary.objects.count()}
+
+
+@task()
+def rebuild_standings(job):
+    changed = models.SemesterStanding.objects.rebuild()
+    caching.bump_version(caching.RESULTS)
+    caching.bump_students(changed)
+    return {'rows': models.SemesterStanding.objects.count(), 'students_changed': len(changed)}
@@ -1,3 +1,806 @@
-from django.test import TestCase
+import datetime
+import io
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core import checks
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.utils import timezone
+from . import caching
+from . import importers
+from . import models
+from . import search
+from . import seeding
+from . import tasks
+from . import views
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = models.User.objects.create_user(
+            username='staff', email='staff@example.com', password='pw',
+            first_name='Staff', last_name='User', role='Teacher', is_staff=True,
+        )
+        # bulk_create rows share one date_joined, down to the microsecond
+        joined = timezone.now().replace(microsecond=123456)
+        models.User.objects.bulk_create([
+            models.User(
+                username=f'student{number}', email=f'student{number}@example.com',
+                first_name='Student', last_name=str(number), role='Student', date_joined=joined,
+            )
+            for number in range(12)
+        ])
+        self.client.force_login(self.staff)
+
+    def walk(self, url, view_class, context_name, direction='next'):
+        """
+        Follow the pagination links from ``url`` until they run out and
+        return every id seen.
+        """
+        seen = []
+        with mock.patch.object(view_class, 'paginate_by', 5):
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                seen += [user.pk for user in response.context[context_name]]
+                query = response.context[f'{direction}_page_query']
+                url = f'{response.request["PATH_INFO"]}?{query}' if query else None
+        return seen
+
+    def last_page_url(self, url, view_class, context_name):
+        with mock.patch.object(view_class, 'paginate_by', 5):
+            while True:
+                response = self.client.get(url)
+                query = response.context['next_page_query']
+                if not query:
+                    return url
+                url = f'{response.request["PATH_INFO"]}?{query}'
+
+    def test_pages_through_tied_timestamps(self):
+        for name, view_class, context_name, queryset in (
+            ('accounts:user_list', views.UserListView, 'users', models.User.objects.filter(is_superuser=False)),
+            ('accounts:student_list', views.StudentListView, 'students', models.User.objects.filter(role='Student')),
+        ):
+            with self.subTest(name):
+                expected = list(queryset.order_by('-date_joined', '-id').values_list('pk', flat=True))
+                url = reverse(name)
+                self.assertEqual(self.walk(url, view_class, context_name), expected)
+
+                last = self.last_page_url(url, view_class, context_name)
+                backwards = self.walk(last, view_class, context_name, direction='previous')
+                self.assertEqual(sorted(backwards), sorted(expected))
+                self.assertEqual(len(backwards), len(expected))
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse('accounts:user_list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class StaffAccessTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = models.User.objects.create_user(
+            username='staff', email='staff@example.com', password=None, role='Teacher', is_staff=True,
+        )
+        self.url = reverse('accounts:user_list')
+
+    def test_anonymous_users_go_to_login(self):
+        response = self.client.get(self.url)
+        self.assertRedirects(response, f"{reverse('login')}?next={self.url}", fetch_redirect_response=False)
+
+    def test_non_staff_users_go_home(self):
+        student = models.User.objects.create_user(
+            username='student', email='student@example.com', password=None, role='Student',
+        )
+        self.client.force_login(student)
+        self.assertRedirects(self.client.get(self.url), reverse('home'), fetch_redirect_response=False)
+
+    def test_demotion_takes_effect_on_the_next_request(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.staff.is_staff = False
+        self.staff.save()
+        self.assertRedirects(self.client.get(self.url), reverse('home'), fetch_redirect_response=False)
+
+    def test_queryset_updates_invalidate_snapshots(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        models.User.objects.filter(pk=self.staff.pk).update(is_staff=False)
+        self.assertRedirects(self.client.get(self.url), reverse('home'), fetch_redirect_response=False)
+
+        models.User.objects.filter(pk=self.staff.pk).update(is_staff=True, is_active=False)
+        response = self.client.get(self.url)
+        self.assertRedirects(response, f"{reverse('login')}?next={self.url}", fetch_redirect_response=False)
+
+    def test_deploy_check_requires_a_shared_cache(self):
+        def errors():
+            found = checks.run_checks(include_deployment_checks=True, tags=[checks.Tags.caches])
+            return [error.id for error in found if error.id.startswith('accounts.')]
+
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=locmem):
+            self.assertEqual(errors(), ['accounts.E001'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tempfile.gettempdir()}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(errors(), [])
+
+
+class TotalClassCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeding.seed(students=8, subjects=2, years=1, days=2)
+        self.client.force_login(models.User.objects.create_user(
+            username='staff', email='staff@example.com', password=None, role='Teacher', is_staff=True,
+        ))
+
+    def expected_total(self, user_id):
+        return models.TotalClassCount.objects.filter(user_id=user_id).aggregate(total=Sum('total_class_count'))['total'] or 0
+
+    def test_attendance_pages_annotate_totals_in_constant_queries(self):
+        url = reverse('accounts:student_attendance_list')
+        self.client.get(url)
+        query_counts = set()
+        seen = 0
+        with mock.patch.object(views.StudentAttendanceView, 'paginate_by', 5):
+            while url:
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url)
+                query_counts.add(len(context))
+                for record in response.context['attendance_records']:
+                    self.assertEqual(record.total_classes, self.expected_total(record.user_id))
+                    seen += 1
+                query = response.context['next_page_query']
+                url = f"{reverse('accounts:student_attendance_list')}?{query}" if query else None
+
+        self.assertEqual(seen, models.StudentAttendance.objects.filter(user__role='Student').count())
+        self.assertGreater(seen, 10)
+        # Pages past the first seek with a cursor, but no page costs a query per row
+        self.assertLessEqual(max(query_counts) - min(query_counts), 1)
+
+    def test_total_classes_count_uses_annotation_or_prefetch(self):
+        students = models.User.objects.filter(role='Student')
+        for queryset in (students.with_total_classes(), students.prefetch_related('totalclasses')):
+            users = list(queryset)
+            with self.assertNumQueries(0):
+                totals = {user.pk: user.total_classes_count for user in users}
+            self.assertEqual(totals, {user.pk: self.expected_total(user.pk) for user in users})
+
+
+class ClassAttendanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeding.seed(students=12, subjects=1, years=1, days=0)
+        self.subject = models.Subject.objects.get()
+        self.class_list = models.StudentProfile.objects.values_list('class_list', flat=True).order_by('pk').first()
+        self.roster = list(models.StudentProfile.objects.filter(class_list=self.class_list).order_by('pk'))
+        self.client.force_login(models.User.objects.create_user(
+            username='teacher', email='teacher@example.com', password=None, role='Teacher', is_staff=True,
+        ))
+
+    def mark(self, statuses):
+        data = {'class_list': self.class_list, 'subject': self.subject.pk}
+        data.update({f'status_{profile.pk}': status for profile, status in zip(self.roster, statuses)})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('accounts:student_class_attendance'), data)
+        self.assertRedirects(response, reverse('accounts:student_attendance_list'), fetch_redirect_response=False)
+        writes = [query for query in context.captured_queries if query['sql'].startswith('INSERT INTO "accounts_studentattendance"')]
+        self.assertEqual(len(writes), 1)
+        return dict(models.StudentAttendance.objects.filter(subject=self.subject).values_list('roll_id', 'status'))
+
+    def test_remarking_updates_rows_in_place(self):
+        self.assertGreater(len(self.roster), 1)
+        first = self.mark(['Present'] * len(self.roster))
+        self.assertEqual(first, {profile.pk: 'Present' for profile in self.roster})
+        ids = set(models.StudentAttendance.objects.values_list('pk', flat=True))
+
+        # Same class, subject and day: the conflict path updates the rows
+        changed = ['Absent'] + ['Present'] * (len(self.roster) - 1)
+        second = self.mark(changed)
+        self.assertEqual(second, {profile.pk: status for profile, status in zip(self.roster, changed)})
+        self.assertEqual(set(models.StudentAttendance.objects.values_list('pk', flat=True)), ids)
+
+        summary = models.AttendanceSummary.objects.get(user_id=self.roster[0].user_id, subject=self.subject)
+        self.assertEqual(summary.total_present, 0)
+        summaries = set(models.AttendanceSummary.objects.values_list('user', 'subject', 'total_classes', 'total_present'))
+        models.AttendanceSummary.objects.rebuild()
+        self.assertEqual(set(models.AttendanceSummary.objects.values_list('user', 'subject', 'total_classes', 'total_present')), summaries)
+
+    def test_unknown_statuses_are_skipped(self):
+        marked = self.mark(['Present', 'Sleeping'] + ['Absent'] * (len(self.roster) - 2))
+        self.assertNotIn(self.roster[1].pk, marked)
+        self.assertEqual(len(marked), len(self.roster) - 1)
+
+
+class RollSequenceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(models.User.objects.create_user(
+            username='staff', email='staff@example.com', password=None, role='Teacher', is_staff=True,
+        ))
+
+    def enroll(self, name, class_list='1'):
+        user = models.User.objects.create_user(
+            username=name, email=f'{name}@example.com', password=None, first_name=name, last_name='Test', role='Student',
+        )
+        response = self.client.post(reverse('accounts:student_class', kwargs={'pk': user.pk}), {'class_list': class_list})
+        self.assertEqual(response.status_code, 302)
+        return models.StudentProfile.objects.get(user=user)
+
+    def test_allocate_hands_out_consecutive_numbers(self):
+        allocate = models.RollSequence.objects.allocate
+        self.assertEqual(allocate(2026, '1'), 1)
+        self.assertEqual(allocate(2026, '1'), 2)
+        self.assertEqual(allocate(2026, '1', count=3), 3)
+        self.assertEqual(allocate(2026, '1'), 6)
+        # Each (year, class) counts on its own
+        self.assertEqual(allocate(2026, '2'), 1)
+        self.assertEqual(allocate(2027, '1'), 1)
+
+    def test_rollback_gives_numbers_back(self):
+        allocate = models.RollSequence.objects.allocate
+        allocate(2026, '1')
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            allocate(2026, '1', count=5)
+            raise RuntimeError
+        self.assertEqual(allocate(2026, '1'), 2)
+
+    def test_rolls_stay_unique_after_a_deletion(self):
+        year = datetime.datetime.now().year
+        first, second, third = (self.enroll(name) for name in ('ann', 'ben', 'cat'))
+        self.assertEqual([first.roll, second.roll, third.roll], [f'{year}1{number}' for number in (1, 2, 3)])
+
+        second.user.delete()
+        # A count of the class plus one would hand out third's roll again
+        fourth = self.enroll('dan')
+        self.assertEqual(fourth.roll, f'{year}14')
+        other_class = self.enroll('eve', class_list='2')
+        self.assertEqual(other_class.roll, f'{year}21')
+        rolls = list(models.StudentProfile.objects.values_list('roll', flat=True))
+        self.assertEqual(len(rolls), len(set(rolls)))
+
+    def test_backfill_continues_after_existing_rolls(self):
+        for number, roll in enumerate(('202613', '202617', '202621', 'legacy')):
+            user = models.User.objects.create_user(
+                username=f'old{number}', email=f'old{number}@example.com', password=None, role='Student',
+            )
+            models.StudentProfile.objects.create(user=user, class_list=roll[4] if roll[0] == '2' else '1', roll=roll)
+
+        output = io.StringIO()
+        call_command('backfill_roll_sequences', stdout=output)
+        self.assertIn("Skipped 1", output.getvalue())
+        self.assertEqual(models.RollSequence.objects.allocate(2026, '1'), 8)
+        self.assertEqual(models.RollSequence.objects.allocate(2026, '2'), 2)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeding.seed(students=4, subjects=2, years=1, days=2)
+        self.student = models.User.objects.filter(
+            role='Student', studentresult__isnull=False, studentattendance__isnull=False,
+        ).order_by('pk').first()
+        self.client.force_login(self.student)
+
+    def revalidate(self, url, change):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        unchanged_queries = len(context)
+
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return unchanged_queries
+
+    def test_result_pages(self):
+        def change():
+            result = models.StudentResult.objects.filter(user=self.student).first()
+            result.cgpa += 0.01
+            result.save()
+
+        for name in ('accounts:student_result_list', 'accounts:async_student_result_list'):
+            with self.subTest(name):
+                self.assertLessEqual(self.revalidate(reverse(name), change), 3)
+
+    def test_attendance_pages(self):
+        def change():
+            attendance = models.StudentAttendance.objects.filter(user=self.student).first()
+            attendance.status = 'Absent' if attendance.status == 'Present' else 'Present'
+            attendance.save()
+
+        for name in ('accounts:student_attendance_list', 'accounts:async_student_attendance_list'):
+            with self.subTest(name):
+                self.revalidate(reverse(name), change)
+
+    def test_class_count_change_is_a_new_page(self):
+        def change():
+            total = models.TotalClassCount.objects.filter(user=self.student).first()
+            total.total_class_count += 5
+            total.save()
+
+        self.revalidate(reverse('accounts:student_attendance_list'), change)
+
+    def test_other_students_changes_keep_the_page(self):
+        url = reverse('accounts:student_result_list')
+        etag = self.client.get(url)['ETag']
+        other = models.StudentResult.objects.exclude(user=self.student).exclude(
+            user__studentprofile__class_list=self.student.studentprofile.class_list,
+        ).first()
+        other.cgpa += 0.01
+        other.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class ClassResultGridTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeding.seed(students=40, subjects=2, years=1, days=0)
+        largest = models.StudentProfile.objects.values('class_list').annotate(size=Count('pk')).order_by('-size', 'class_list')[0]
+        result = models.StudentResult.objects.filter(
+            user__studentprofile__class_list=largest['class_list'],
+        ).order_by('pk').first()
+        self.grid = {
+            'class_list': result.user.studentprofile.class_list,
+            'year': result.year,
+            'semester': result.semester,
+            'subject': result.subject_id,
+        }
+        self.roster = list(models.StudentProfile.objects.filter(
+            user__role='Student', class_list=self.grid['class_list'],
+        ).order_by('roll'))
+        self.client.force_login(models.User.objects.create_user(
+            username='teacher', email='teacher@example.com', password=None, role='Teacher', is_staff=True,
+        ))
+
+    def results(self):
+        return {
+            result.user_id: result
+            for result in models.StudentResult.objects.filter(
+                user__in=[profile.user_id for profile in self.roster],
+                year=self.grid['year'], semester=self.grid['semester'], subject=self.grid['subject'],
+            )
+        }
+
+    def post(self, cells):
+        data = dict(self.grid)
+        data.update({f'cgpa_{profile.pk}': value for profile, value in cells.items()})
+        return self.client.post(reverse('accounts:student_class_result'), data)
+
+    def test_only_changed_cells_are_written(self):
+        before = self.results()
+        self.assertGreater(len(before), 1)
+        changed = self.roster[0]
+        cells = {profile: before[profile.user_id].cgpa for profile in self.roster if profile.user_id in before}
+        cells[changed] = 0.5
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.post(cells)
+        self.assertRedirects(response, reverse('accounts:student_result_list'), fetch_redirect_response=False)
+        writes = [query for query in context.captured_queries if query['sql'].startswith('INSERT INTO "accounts_studentresult"')]
+        self.assertEqual(len(writes), 1)
+
+        after = self.results()
+        self.assertEqual(after[changed.user_id].cgpa, 0.5)
+        self.assertEqual(after[changed.user_id].pk, before[changed.user_id].pk)
+        for user_id, result in before.items():
+            if user_id != changed.user_id:
+                self.assertEqual(after[user_id].updated_at, result.updated_at)
+        # Averages and ranks follow the grid without a rebuild
+        self.assertEqual(models.SemesterStanding.objects.rebuild(), set())
+
+    def test_bad_cells_reject_the_whole_grid(self):
+        before = {user_id: result.cgpa for user_id, result in self.results().items()}
+        response = self.post({self.roster[0]: '4.0', self.roster[1]: 'A+'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Enter a number of 0 or more.")
+        self.assertEqual({user_id: result.cgpa for user_id, result in self.results().items()}, before)
+
+
+class AsyncAttendanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeding.seed(students=4, subjects=2, years=1, days=4)
+        self.student = models.User.objects.filter(role='Student', studentattendance__isnull=False).order_by('pk').first()
+        self.staff = models.User.objects.create_user(
+            username='staff', email='staff@example.com', password=None, role='Teacher', is_staff=True,
+        )
+        self.subject = models.StudentAttendance.objects.filter(user=self.student).order_by('pk').first().subject
+        self.expected = {
+            params.get('subject'): list(
+                models.StudentAttendance.objects.filter(user=self.student, **params)
+                .order_by('-created_at', '-id').values_list('pk', flat=True)
+            )
+            for params in ({}, {'subject': self.subject.pk})
+        }
+        self.totals = models.AttendanceSummary.objects.totals_for(self.student.pk)
+        self.url = reverse('accounts:async_student_attendance_list')
+
+    async def walk(self, params):
+        seen = []
+        # The next page's query keeps the filters
+        query = urlencode(params)
+        with mock.patch.object(views.AsyncStudentAttendanceView, 'paginate_by', 3):
+            while True:
+                response = await self.async_client.get(f'{self.url}?{query}')
+                self.assertEqual(response.status_code, 200)
+                seen += [record.pk for record in response.context['attendance_records']]
+                query = response.context['next_page_query']
+                if not query:
+                    return seen, response
+
+    async def test_student_pages_through_their_attendance(self):
+        await self.async_client.aforce_login(self.student)
+        seen, response = await self.walk({})
+        self.assertEqual(seen, self.expected[None])
+        self.assertGreater(len(seen), 3)
+        for key, value in self.totals.items():
+            self.assertEqual(response.context[key], value)
+
+        seen, response = await self.walk({'subject': self.subject.pk})
+        self.assertEqual(seen, self.expected[self.subject.pk])
+
+    async def test_others_are_sent_to_login_or_the_sync_page(self):
+        response = await self.async_client.get(self.url)
+        self.assertRedirects(response, f"{reverse('login')}?next={self.url}", fetch_redirect_response=False)
+
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(self.url, {'class': '1'})
+        self.assertRedirects(
+            response, f"{reverse('accounts:student_attendance_list')}?class=1", fetch_redirect_response=False,
+        )
+
+    async def test_student_detail(self):
+        url = reverse('accounts:async_student_detail', kwargs={'pk': self.student.pk})
+        await self.async_client.aforce_login(self.student)
+        self.assertRedirects(await self.async_client.get(url), reverse('home'), fetch_redirect_response=False)
+
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(url)
+        self.assertContains(response, self.student.last_name)
+        missing = reverse('accounts:async_student_detail', kwargs={'pk': self.staff.pk})
+        self.assertEqual((await self.async_client.get(missing)).status_code, 404)
+
+
+class VersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_lost_counter_never_reuses_a_version(self):
+        first = caching.get_version('tests')
+        caching.bump_version('tests')
+        bumped = caching.get_version('tests')
+        self.assertGreater(bumped, first)
+
+        # Evicted, then read again or bumped: still newer than anything seen
+        cache.clear()
+        self.assertGreater(caching.get_version('tests'), bumped)
+        cache.clear()
+        caching.bump_version('tests')
+        self.assertGreater(caching.get_version('tests'), bumped)
+        cache.clear()
+        self.assertNotIn(f'tests.{bumped}', caching.version_token('tests'))
+
+
+class CSVExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeding.seed(students=5, subjects=2, years=1, days=2)
+        self.client.force_login(models.User.objects.create_user(
+            username='exporter', email='exporter@example.com', password='pw', role='Teacher', is_staff=True,
+        ))
+
+    def export(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_exports_every_matching_row(self):
+        rows = self.export('accounts:student_result_export')
+        self.assertEqual(rows[0].split(',')[0], 'Year')
+        self.assertEqual(len(rows) - 1, models.StudentResult.objects.count())
+
+        rows = self.export('accounts:student_attendance_export')
+        self.assertEqual(rows[0].split(',')[0], 'Date')
+        self.assertEqual(len(rows) - 1, models.StudentAttendance.objects.filter(user__role='Student').count())
+
+    def test_filters_apply(self):
+        profile = models.StudentProfile.objects.order_by('pk').first()
+        rows = self.export('accounts:student_result_export', **{'class': profile.class_list})
+        expected = models.StudentResult.objects.filter(user__studentprofile__class_list=profile.class_list).count()
+        self.assertEqual(len(rows) - 1, expected)
+
+
+class RecordFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeding.seed(students=4, subjects=2, years=1, days=2)
+        self.staff = models.User.objects.create_user(
+            username='filterer', email='filterer@example.com', password='pw', role='Teacher', is_staff=True,
+        )
+        self.student = models.User.objects.filter(role='Student', studentattendance__isnull=False).order_by('pk').first()
+
+    def test_bad_integer_filters_are_ignored(self):
+        self.client.force_login(self.staff)
+        everything = models.StudentAttendance.objects.filter(user__role='Student').count()
+        for params in ({'year': 'abc'}, {'subject': 'abc'}, {'year': '2x', 'subject': '1; drop'}):
+            with self.subTest(params):
+                response = self.client.get(reverse('accounts:student_attendance_list'), params)
+                self.assertEqual(response.status_code, 200)
+
+                response = self.client.get(reverse('accounts:student_attendance_export'), params)
+                self.assertEqual(response.status_code, 200)
+                rows = b''.join(response.streaming_content).decode().splitlines()
+                self.assertEqual(len(rows) - 1, everything)
+
+        self.client.force_login(self.student)
+        for name in ('accounts:student_attendance_list', 'accounts:async_student_attendance_list'):
+            with self.subTest(name):
+                response = self.client.get(reverse(name), {'year': 'abc', 'subject': 'abc'})
+                self.assertEqual(response.status_code, 200)
+
+    def test_valid_integer_filters_apply(self):
+        self.client.force_login(self.staff)
+        attendance = models.StudentAttendance.objects.filter(user__role='Student').order_by('pk').first()
+        params = {'year': attendance.created_at.year, 'subject': attendance.subject_id}
+        response = self.client.get(reverse('accounts:student_attendance_export'), params)
+        rows = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows) - 1, models.StudentAttendance.objects.filter(
+            user__role='Student', created_at__year=attendance.created_at.year, subject=attendance.subject_id,
+        ).count())
+        self.assertLess(len(rows) - 1, models.StudentAttendance.objects.filter(user__role='Student').count())
+
+
+class StandingRebuildTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeding.seed(students=10, subjects=2, years=1, days=0)
+
+    def test_rebuild_reports_and_invalidates_changed_students(self):
+        self.assertEqual(models.SemesterStanding.objects.rebuild(), set())
+
+        # Edited without signals, as a bulk fix or restore would
+        result = models.StudentResult.objects.order_by('pk').first()
+        models.StudentResult.objects.filter(pk=result.pk).update(cgpa=0.1)
+        before = caching.get_version(caching.student_namespace(result.user_id))
+
+        call_command('rebuild_standings', stdout=io.StringIO())
+        self.assertGreater(caching.get_version(caching.student_namespace(result.user_id)), before)
+        standing = models.SemesterStanding.objects.get(
+            user_id=result.user_id, year=result.year, semester=result.semester,
+        )
+        self.assertEqual(standing.rank, models.SemesterStanding.objects.filter(
+            year=result.year, semester=result.semester, class_list=standing.class_list,
+            average__gt=standing.average,
+        ).count() + 1)
+
+
+class StudentResultFragmentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeding.seed(students=3, subjects=2, years=1, days=0)
+        self.student = models.User.objects.filter(role='Student').order_by('pk').first()
+        self.client.force_login(self.student)
+
+    def test_profile_edit_refreshes_the_cached_fragment(self):
+        for name in ('accounts:student_result_list', 'accounts:async_student_result_list'):
+            with self.subTest(name):
+                self.assertContains(self.client.get(reverse(name)), self.student.last_name)
+
+                self.student.last_name = f'Renamed{len(name)}'
+                self.student.save()
+                self.assertContains(self.client.get(reverse(name)), self.student.last_name)
+
+
+class StudentDeleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeding.seed(students=12, subjects=3, years=2, days=3)
+        self.student = models.User.objects.filter(role='Student', studentresult__isnull=False).order_by('pk').first()
+
+    def summaries(self):
+        return set(models.AttendanceSummary.objects.values_list('user', 'subject', 'total_classes', 'total_present'))
+
+    def assert_derived_tables_current(self):
+        summaries = self.summaries()
+        models.AttendanceSummary.objects.rebuild()
+        self.assertEqual(self.summaries(), summaries)
+        self.assertEqual(models.SemesterStanding.objects.rebuild(), set())
+
+    def delete(self, obj):
+        with CaptureQueriesContext(connection) as context:
+            obj.delete()
+        # Once per student, not once per attendance or result row
+        summary_updates = [query for query in context.captured_queries if query['sql'].startswith('UPDATE "accounts_attendancesummary"')]
+        self.assertEqual(summary_updates, [])
+        return context
+
+    def test_deleting_user(self):
+        self.delete(self.student)
+        self.assertFalse(models.SemesterStanding.objects.filter(user_id=self.student.pk).exists())
+        self.assert_derived_tables_current()
+
+    def test_deleting_profile(self):
+        self.delete(self.student.studentprofile)
+        self.assertFalse(models.StudentResult.objects.filter(user=self.student).exists())
+        self.assertFalse(models.SemesterStanding.objects.filter(user_id=self.student.pk).exists())
+        self.assert_derived_tables_current()
+
+    def test_deleting_one_row_still_updates(self):
+        result = models.StudentResult.objects.filter(user=self.student).first()
+        result.delete()
+        self.assert_derived_tables_current()
+        attendance = models.StudentAttendance.objects.filter(user=self.student, status='Present').first()
+        attendance.delete()
+        self.assert_derived_tables_current()
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.christopher = self.make_student('Christopher', 'Wallace', '2026301')
+        self.aisha = self.make_student('Aisha', 'Rahman', '2026302')
+        self.zed = self.make_student('Zed', 'Okafor', '2026799')
+
+    def make_student(self, first_name, last_name, roll):
+        user = models.User.objects.create_user(
+            username=first_name.lower(), email=f'{first_name.lower()}@example.com', password=None,
+            first_name=first_name, last_name=last_name, role='Student',
+        )
+        models.StudentProfile.objects.create(user=user, class_list=roll[4], roll=roll)
+        return user
+
+    def search(self, term, **kwargs):
+        return set(search.search_users(models.User.objects.all(), term, **kwargs))
+
+    def indexed(self, user):
+        if not search.index_available():
+            self.skipTest("No search index table on this database")
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT first_name, last_name, roll FROM {search.SEARCH_TABLE} WHERE rowid = %s", [user.pk])
+            return cursor.fetchone()
+
+    def test_partial_matches(self):
+        self.assertEqual(self.search('stoph'), {self.christopher})
+        self.assertEqual(self.search('RAHM'), {self.aisha})
+        self.assertEqual(self.search('202630'), {self.christopher, self.aisha})
+        self.assertEqual(self.search('aisha@exa', columns=('email',)), {self.aisha})
+        # Shorter than a trigram: plain icontains
+        self.assertEqual(self.search('Ze'), {self.zed})
+        # Exact substrings only: a roll that doesn't exist finds nobody
+        self.assertEqual(self.search('2026310'), set())
+        self.assertEqual(self.search('Cristopher'), set())
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(self.indexed(self.aisha), ('Aisha', 'Rahman', '2026302'))
+
+        self.aisha.last_name = 'Siddiqui'
+        self.aisha.save()
+        profile = self.aisha.studentprofile
+        profile.roll = '2026355'
+        profile.save()
+        self.assertEqual(self.indexed(self.aisha), ('Aisha', 'Siddiqui', '2026355'))
+        self.assertEqual(self.search('Siddiq'), {self.aisha})
+        self.assertEqual(self.search('2026355'), {self.aisha})
+        self.assertEqual(self.search('Rahman'), set())
+
+        profile.delete()
+        self.assertEqual(self.indexed(self.aisha), ('Aisha', 'Siddiqui', ''))
+
+        pk = self.aisha.pk
+        self.aisha.delete()
+        self.aisha.pk = pk
+        self.assertIsNone(self.indexed(self.aisha))
+        self.assertEqual(self.search('Siddiqui'), set())
+
+    def test_login_save_skips_the_index(self):
+        self.christopher.last_login = timezone.now()
+        with CaptureQueriesContext(connection) as context:
+            self.christopher.save(update_fields=['last_login'])
+        self.assertFalse([query for query in context.captured_queries if search.SEARCH_TABLE in query['sql']])
+
+    def test_student_list_search(self):
+        staff = models.User.objects.create_user(
+            username='staff', email='staff@example.com', password='pw', role='Teacher', is_staff=True,
+        )
+        self.client.force_login(staff)
+        response = self.client.get(reverse('accounts:student_list'), {'search': 'allac'})
+        self.assertEqual(list(response.context['students']), [self.christopher])
+        response = self.client.get(reverse('accounts:student_list'), {'search': '2026799'})
+        self.assertEqual(list(response.context['students']), [self.zed])
+
+
+class StudentImportTests(TestCase):
+    def rows(self, text):
+        return importers.read_rows(io.BytesIO(text.encode()), 'students.csv')
+
+    def test_mixed_file_reports_each_bad_row(self):
+        text = (
+            "first_name,last_name,email,class\n"
+            "Ann,Lee,ann@example.com,1\n"
+            "Bad,Email,not-an-email,1\n"
+            "Ben,Cho,ben@example.com,2\n"
+            "Cat,Day,cat@example.com,Z\n"
+            "Dan,Eze,dan@example.com,2\n"
+            "Ann,Again,ann@example.com,1\n"
+        )
+        save_chunk = importers._save_chunk
+
+        def taken_meanwhile(students, year):
+            # Another request signs Ben up between the email check and the save
+            if not models.User.objects.filter(email='ben@example.com').exists():
+                models.User.objects.create_user(username='ben', email='ben@example.com', password=None)
+            return save_chunk(students, year)
+
+        with mock.patch.object(importers, '_save_chunk', side_effect=taken_meanwhile):
+            report = importers.import_students(self.rows(text), year=2026)
+
+        self.assertEqual(report.created, 2)
+        self.assertEqual([row_number for row_number, message in report.errors], [3, 4, 5, 7])
+        self.assertIn("Could not be saved", dict(report.errors)[4])
+        imported = models.User.objects.filter(role='Student')
+        self.assertEqual(set(imported.values_list('email', flat=True)), {'ann@example.com', 'dan@example.com'})
+        rolls = set(models.StudentProfile.objects.values_list('roll', flat=True))
+        self.assertEqual(len(rolls), 2)
+
+    def test_rerun_reports_saved_rows_as_existing(self):
+        text = "first_name,last_name,email,class\nAnn,Lee,ann@example.com,1\nBen,Cho,ben@example.com,2\n"
+        self.assertEqual(importers.import_students(self.rows(text), year=2026).created, 2)
+        report = importers.import_students(self.rows(text), year=2026)
+        self.assertEqual(report.created, 0)
+        self.assertEqual(len(report.errors), 2)
+        self.assertTrue(all("already exists" in message for row_number, message in report.errors))
+
+
+class ImportJobTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # As the test client does: closing would end the test's transaction
+        patcher = mock.patch.object(tasks, 'close_old_connections')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_import(self, content, attempts=1):
+        path = default_storage.save('imports/students.csv', ContentFile(content))
+        job = tasks.enqueue('import_students', path=path, filename='students.csv')
+        models.Job.objects.filter(pk=job.pk).update(status='Running', attempts=attempts)
+        return tasks.run_job(job.pk), path
+
+    def test_upload_kept_for_retries_and_deleted_on_failure(self):
+        with mock.patch.object(tasks.importers, 'import_students', side_effect=RuntimeError('database went away')):
+            status, path = self.run_import(b'first_name\n')
+            self.assertEqual(status, 'Queued')
+            self.assertTrue(default_storage.exists(path))
+
+            models.Job.objects.all().delete()
+            status, path = self.run_import(b'first_name\n', attempts=3)
+            self.assertEqual(status, 'Failed')
+            self.assertFalse(default_storage.exists(path))
+
+    def test_unreadable_upload_is_deleted(self):
+        status, path = self.run_import(b'\xff\xfe\x00not a csv')
+        self.assertEqual(status, 'Failed')
+        self.assertFalse(default_storage.exists(path))
@@ -14,7 +14,9 @@ urlpatterns = [
     
     path("students/", views.StudentListView.as_view(), name="student_list"),
     path("students/create/", views.StudentCreateView.as_view(), name="student_create"),
+    path("students/import/", views.StudentImportView.as_view(), name="student_import"),
     path("students/create/class/<int:pk>/", views.StudentClassView.as_view(), name="student_class"),
+    path("students/autocomplete/", views.StudentAutocompleteView.as_view(), name="student_autocomplete"),
     path("students/student_detail/<int:pk>/", views.StudentDetailView.as_view(), name="student_detail"),
     path("students/student_update_user/<int:pk>/", views.StudentAccountUpdateView.as_view(), name="student_update_user"),
     path("students/student_update_class/<int:pk>/", views.StudentClassUpdateView.as_view(), name="student_update_class"),
@@ -22,19 +24,35 @@ urlpatterns = [
     
     
     path("students/student_add_result/", views.StudentAddResultView.as_view(), name="student_add_result"),
+    path("students/student_class_result/", views.StudentClassResultView.as_view(), name="student_class_result"),
     path("students/student_result_list/", views.StudentResultListView.as_view(), name="student_result_list"),
+    path("students/student_result_export/", views.StudentResultExportView.as_view(), name="student_result_export"),
     path("students/student_result_update/<int:pk>/", views.StudentResultUpdateView.as_view(), name="student_result_update"),
     path("students/student_result_delete/<int:pk>/", views.StudentResultDeleteView.as_view(), name="student_result_delete"),
     path("students/student_result_delete/<int:pk>/", views.StudentResultDeleteView.as_view(), name="student_result_delete"),
     
     
     path("students/student_add_attendance/", views.StudentAddAttendanceView.as_view(), name="student_add_attendance"),
+    path("students/student_class_attendance/", views.StudentClassAttendanceView.as_view(), name="student_class_attendance"),
     path("students/student_attendance_list/", views.StudentAttendanceView.as_view(), name="student_attendance_list"),
+    path("students/student_attendance_export/", views.StudentAttendanceExportView.as_view(), name="student_attendance_export"),
     path("students/student_attendance_update/<int:pk>/", views.StdentAttendanceUpdateView.as_view(), name="student_attendance_update"),
+
+
+    # Async versions of the read-heavy pages, for ASGI deployments
+    path("students/async/student_result_list/", views.AsyncStudentResultListView.as_view(), name="async_student_result_list"),
+    path("students/async/student_attendance_list/", views.AsyncStudentAttendanceView.as_view(), name="async_student_attendance_list"),
+    path("students/async/student_detail/<int:pk>/", views.AsyncStudentDetailView.as_view(), name="async_student_detail"),
     
     
     path("stuffs/subject/assign_subject/", views.AssignAllSubjectView.as_view(), name="assign_subject"),
     path("stuffs/subject/subject_list/", views.SubjectListView.as_view(), name="subject_list"),
     path("stuffs/subject/subject_update/<int:pk>/", views.SubjectUpdateView.as_view(), name="subject_update"),
     path("stuffs/subject/subject_delete/<int:pk>/", views.SubjectDeleteView.as_view(), name="subject_delete"),
+    
+    
+    path("stuffs/jobs/", views.JobListView.as_view(), name="job_list"),
+    path("stuffs/jobs/<int:pk>/", views.JobDetailView.as_view(), name="job_detail"),
+    path("stuffs/class_report/", views.ClassReportView.as_view(), name="class_report"),
+    path("stuffs/request_profile/", views.RequestProfileView.as_view(), name="request_profile"),
 ]
@@ -1,38 +1,120 @@
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.shortcuts import render, reverse, redirect
 from django.views import generic
-from django.db.models import Q
-from django.contrib.auth import mixins as auth_mixins
+from django.db.models import Q, Count, Avg, Max
 from . import mixins
+from . import analytics
+from . import caching
+from . import facets
 from . import forms
+from . import middleware
 from . import models
+from . import roles
+from . import search
+from . import signals
+from . import tasks
+from . import widgets
 from django.shortcuts import get_object_or_404
-from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, StreamingHttpResponse, JsonResponse
+from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.conf import settings
+from django.core.files.storage import default_storage
+import csv
+import functools
+import hashlib
 import datetime
 import random
+import uuid
 
 
-class UserListView(mixins.StaffRequiredMixin, generic.ListView):
-    template_name = "users/user_list.html"
+class Echo:
+    """
+    File-like object for csv.writer that hands each row back instead of
+    buffering it.
+    """
+    def write(self, value):
+        return value
+
+
+def student_page_validators(snapshot, queryset, *extra):
+    """
+    ETag and Last-Modified for a student's own page: row count and newest
+    updated_at of ``queryset`` (one indexed aggregate), plus the versions of
+    what else the page shows (their profile, subject names, the header).
+    """
+    stats = queryset.aggregate(count=Count('id'), last_modified=Max('updated_at'))
+    token = caching.version_token(*_student_page_namespaces(snapshot))
+    return _student_page_etag(stats, token, extra)
+
+
+async def astudent_page_validators(snapshot, queryset, *extra):
+    stats = await queryset.aaggregate(count=Count('id'), last_modified=Max('updated_at'))
+    token = await caching.aversion_token(*_student_page_namespaces(snapshot))
+    return _student_page_etag(stats, token, extra)
+
+
+def _student_page_namespaces(snapshot):
+    return (
+        caching.user_namespace(snapshot.id),
+        caching.student_namespace(snapshot.id),
+        caching.SUBJECTS,
+    )
+
+
+def _student_page_etag(stats, token, extra):
+    last_modified = stats['last_modified']
+    parts = [stats['count'], last_modified.timestamp() if last_modified else 0, token, *extra]
+    etag = hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+    return etag, last_modified
+
+
+def group_results(results, bucket_stats, standings):
+    """
+    Nest a page of results as {year: {semester: bucket}}, each bucket with
+    its rows and the semester's totals and standing.
+    """
+    grouped_results = {}
+
+    for result in results:
+        year = result.year
+        semester = result.semester
+
+        if year not in grouped_results:
+            grouped_results[year] = {}
+
+        if semester not in grouped_results[year]:
+            stats = bucket_stats.get((year, semester), {})
+            grouped_results[year][semester] = {
+                'rows': [],
+                'total': stats.get('total', 0),
+                'average': stats.get('average'),
+                'standing': standings.get((year, semester)),
+            }
+
+        grouped_results[year][semester]['rows'].append(result)
+
+    return grouped_results
+
+
+class UserListView(mixins.StaffRequiredMixin, mixins.KeysetPaginationMixin, generic.ListView):
+    template_name = "accounts/user_list.html"
     context_object_name = 'users'
-    
-    def dispatch(self, request, *args, **kwargs):
-        if not request.user.is_staff:
-            return redirect("home")
-        return super().dispatch(request, *args, **kwargs)
+    cursor_fields = ('-date_joined', '-id')
     
     def get_queryset(self):
         queryset = models.User.objects.filter(is_superuser=False)
         
-        search = self.request.GET.get('search')
+        term = self.request.GET.get('search')
         
-        if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(role__icontains=search)
+        if term:
+            queryset = search.search_users(
+                queryset,
+                term,
+                columns=('first_name', 'last_name', 'email', 'role')
             )
             
         return queryset
@@ -109,37 +191,34 @@ class UserUpdateView(mixins.StaffRequiredMixin, generic.UpdateView):
 
 
 
-class StudentListView(mixins.StaffRequiredMixin, generic.ListView):
+class StudentListView(mixins.StaffRequiredMixin, mixins.KeysetPaginationMixin, generic.ListView):
     template_name = "students/student_list.html"
     context_object_name = 'students'
+    cursor_fields = ('-date_joined', '-id')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['class_choices'] = sorted(
-            models.StudentProfile.objects.values_list('class_list', flat=True).distinct(),
-            key=lambda x: int(x)  # convert string to int for correct numeric order
-        )
+        context['class_choices'] = facets.class_facets()
+        context['cache_version'] = caching.version_token(caching.STUDENTS)
         return context
 
     
     def get_queryset(self):
         queryset = models.User.objects.filter(role='Student').select_related('studentprofile')
         
-        search = self.request.GET.get('search')
+        term = self.request.GET.get('search')
         
-        if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(studentclass__class_list__icontains=search) |
-                Q(studentclass__roll__icontains=search)
+        if term:
+            queryset = search.search_users(
+                queryset,
+                term,
+                columns=('first_name', 'last_name', 'email', 'class_list', 'roll')
             )
             
         category_filter = self.request.GET.get('class')
         
         if category_filter:
-            queryset = queryset.filter(studentclass__class_list=category_filter)
+            queryset = queryset.filter(studentprofile__class_list=category_filter)
             
         return queryset
     
@@ -161,6 +240,22 @@ class StudentCreateView(mixins.StaffRequiredMixin, generic.CreateView):
     def get_success_url(self):
         return reverse('accounts:student_class', kwargs={'pk': self.object.pk})
 
+class StudentImportView(mixins.StaffRequiredMixin, generic.FormView):
+    template_name = "students/student_import.html"
+    form_class = forms.StudentImportForm
+    
+    def form_valid(self, form):
+        # The worker reads the file from storage; the request returns at once
+        upload = form.cleaned_data['file']
+        path = default_storage.save(f'imports/{uuid.uuid4().hex}_{upload.name}', upload)
+        job = tasks.enqueue(
+            'import_students',
+            user_id=roles.get_snapshot(self.request).id,
+            path=path,
+            filename=upload.name,
+        )
+        return redirect('accounts:job_detail', pk=job.pk)
+
 class StudentClassView(mixins.StaffRequiredMixin, generic.CreateView):
     template_name = "students/student_class.html"
     form_class = forms.StudentClassAssignForm
@@ -175,22 +270,26 @@ class StudentClassView(mixins.StaffRequiredMixin, generic.CreateView):
         class_at = form.cleaned_data['class_list']
         
         current_year = datetime.datetime.now().year
-        count = models.StudentProfile.objects.filter(user__role='Student', class_list=class_at).count() + 1
-        student_class.roll = f'{current_year}{class_at}{count}'
-        
-        student_class.save()
+        with transaction.atomic():
+            number = models.RollSequence.objects.allocate(current_year, class_at)
+            student_class.roll = models.StudentProfile.make_roll(current_year, class_at, number)
+            student_class.save()
 
         return super(StudentClassView, self).form_valid(form)
     
     def get_success_url(self):
         return reverse('accounts:student_list')
     
-class StudentDetailView(mixins.StaffRequiredMixin, generic.DetailView):
+class StudentDetailView(mixins.StaffRequiredMixin, mixins.CachedResponseMixin, generic.DetailView):
     template_name = "students/student_detail.html"
     context_object_name = 'student'
 
+    def get_cache_namespaces(self):
+        pk = self.kwargs['pk']
+        return [caching.user_namespace(pk), caching.student_namespace(pk)]
+
     def get_queryset(self):
-        queryset = models.User.objects.filter(role='Student')
+        queryset = models.User.objects.filter(role='Student').select_related('studentprofile')
         return queryset
     
 class StudentAccountUpdateView(mixins.StaffRequiredMixin, generic.UpdateView):
@@ -244,6 +343,37 @@ class StudentDeleteView(mixins.StaffRequiredMixin, generic.DeleteView):
     def get_success_url(self):
         return reverse('accounts:student_list')
     
+class StudentAutocompleteView(mixins.StaffRequiredMixin, generic.View):
+    """
+    JSON lookup for the roll fields: prefix match on roll, name match
+    through the search index, capped at ``limit`` rows.
+    """
+    limit = 20
+    
+    def get(self, request, *args, **kwargs):
+        term = request.GET.get('q', '').strip()
+        if not term:
+            return JsonResponse({'results': []})
+        
+        profiles = models.StudentProfile.objects.select_related('user').filter(user__role='Student')
+        
+        # roll >= term AND roll < next prefix: a range seek on the roll index
+        upper = term[:-1] + chr(ord(term[-1]) + 1)
+        matches = Q(roll__gte=term, roll__lt=upper)
+        if not term.isdigit():
+            named = search.search_users(
+                models.User.objects.all(),
+                term,
+                columns=('first_name', 'last_name')
+            ).values('pk')
+            matches |= Q(user__in=named)
+        
+        results = [
+            {'id': profile.pk, 'text': widgets.autocomplete_label(profile)}
+            for profile in profiles.filter(matches).order_by('roll')[:self.limit]
+        ]
+        return JsonResponse({'results': results})
+    
 class StudentAddResultView(mixins.StaffRequiredMixin, generic.CreateView):
     template_name = "students/student_add_result.html"
     form_class = forms.StudentAddResult
@@ -261,99 +391,257 @@ class StudentAddResultView(mixins.StaffRequiredMixin, generic.CreateView):
         return reverse('home')
 
 
+
+class StudentClassResultView(mixins.StaffRequiredMixin, generic.FormView):
+    """
+    Enter one subject's CGPA for a whole class and semester in one post.
+    """
+    template_name = "students/student_class_result.html"
+    form_class = forms.ClassResultForm
+    
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        if self.request.method == 'GET' and 'class_list' in self.request.GET:
+            kwargs['data'] = self.request.GET
+        return kwargs
+    
+    def get_roster(self, form):
+        return models.StudentProfile.objects.select_related('user').filter(
+            user__role='Student',
+            class_list=form.cleaned_data['class_list']
+        ).order_by('roll')
     
-class StudentResultListView(auth_mixins.LoginRequiredMixin, generic.ListView):
+    def get_existing(self, form, roster):
+        # One query over unique_student_semester_subject for the whole grid
+        return dict(
+            models.StudentResult.objects.filter(
+                user_id__in=[profile.user_id for profile in roster],
+                year=form.cleaned_data['year'],
+                semester=form.cleaned_data['semester'],
+                subject=form.cleaned_data['subject'],
+            ).values_list('user_id', 'cgpa')
+        )
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = context['form']
+        
+        if 'roster' not in context and form.is_bound and form.is_valid():
+            roster = list(self.get_roster(form))
+            existing = self.get_existing(form, roster)
+            for profile in roster:
+                profile.cgpa = existing.get(profile.user_id, '')
+            context['roster'] = roster
+        return context
+    
+    def form_valid(self, form):
+        roster = list(self.get_roster(form))
+        existing = self.get_existing(form, roster)
+        
+        records = []
+        has_errors = False
+        for profile in roster:
+            value = self.request.POST.get(f'cgpa_{profile.pk}', '').strip()
+            profile.cgpa = value
+            profile.error = None
+            if not value:
+                continue
+            try:
+                cgpa = float(value)
+            except ValueError:
+                cgpa = None
+            if cgpa is None or cgpa < 0:
+                profile.error = "Enter a number of 0 or more."
+                has_errors = True
+                continue
+            if existing.get(profile.user_id) == cgpa:
+                # Unchanged cells are skipped so updated_at stays meaningful
+                continue
+            records.append(models.StudentResult(
+                user_id=profile.user_id,
+                roll=profile,
+                year=form.cleaned_data['year'],
+                semester=form.cleaned_data['semester'],
+                subject=form.cleaned_data['subject'],
+                cgpa=cgpa,
+            ))
+        
+        if has_errors:
+            return self.render_to_response(self.get_context_data(form=form, roster=roster))
+        
+        with transaction.atomic():
+            models.StudentResult.objects.bulk_create(
+                records,
+                update_conflicts=True,
+                unique_fields=['user', 'year', 'semester', 'subject'],
+                update_fields=['roll', 'cgpa', 'updated_at'],
+            )
+            signals.results_bulk_saved.send(
+                sender=models.StudentResult,
+                user_ids=[record.user_id for record in records],
+                year=form.cleaned_data['year'],
+                semester=form.cleaned_data['semester'],
+            )
+        
+        return super().form_valid(form)
+    
+    def get_success_url(self):
+        return reverse('accounts:student_result_list')
+
+    
+class StudentResultListView(mixins.LoginRequiredMixin, mixins.StudentRecordFilterMixin, mixins.KeysetPaginationMixin, mixins.ConditionalGetMixin, mixins.CachedResponseMixin, generic.ListView):
     template_name = "students/student_result_list.html"
     context_object_name = 'results'
+    cursor_fields = ('-year', 'semester', 'id')
+    filter_lookups = {
+        'year': 'year',
+        'semester': 'semester',
+        'class': 'user__studentprofile__class_list',
+    }
     
     def dispatch(self, request, *args, **kwargs):
-        # If the user is anonymous, redirect to home
-        user_role = getattr(request.user, 'role', 'Guest')
-        if user_role == 'Guest':
+        # If the user is anonymous, redirect to login
+        if roles.get_snapshot(request).role == 'Guest':
             return redirect('login')
         return super().dispatch(request, *args, **kwargs)
 
+    def get_cache_namespaces(self):
+        # Only a student's own page is cached whole; staff pages use fragments
+        snapshot = roles.get_snapshot(self.request)
+        if snapshot.role == 'Student':
+            return [caching.student_namespace(snapshot.id), caching.SUBJECTS]
+        return None
+
+    def get_validators(self):
+        snapshot = roles.get_snapshot(self.request)
+        if snapshot.role != 'Student':
+            return None, None
+        return student_page_validators(snapshot, models.StudentResult.objects.filter(user_id=snapshot.id))
+
     def get_queryset(self):
         queryset = models.StudentResult.objects.select_related(
             "user",
-            "user__studentprofile"
+            "user__studentprofile",
+            "subject"
         )
 
-        user_role = getattr(self.request.user, 'role', 'Guest')
-
-        if user_role == 'Student':
-            queryset = queryset.filter(user=self.request.user)
-
         # 🔎 FILTERS
-
-        year_filter = self.request.GET.get('year')
-        if year_filter:
-            queryset = queryset.filter(year=year_filter)
-
-        semester_filter = self.request.GET.get('semester')
-        if semester_filter:
-            queryset = queryset.filter(semester=semester_filter)
-
-        class_filter = self.request.GET.get('class')
-        if class_filter:
-            queryset = queryset.filter(
-                user__studentprofile__class_list=class_filter
-            )
-        search = self.request.GET.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search) |
-                Q(user__email__icontains=search) |
-                Q(user__studentprofile__roll__icontains=search)
-            )
+        queryset = self.filter_records(queryset)
 
         return queryset.order_by('-year', 'semester')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        queryset = context['results']
-
-        grouped_results = {}
+        # Totals per (year, semester) come from one GROUP BY over the filtered
+        # results; only the rows of the current page are loaded.
+        buckets = self.object_list.order_by().values('year', 'semester').annotate(
+            total=Count('id'),
+            average=Avg('cgpa'),
+        ).order_by('-year', 'semester')
+        context['buckets'] = buckets
 
-        for result in queryset:
-            year = result.year
-            semester = result.semester
+        bucket_stats = {(bucket['year'], bucket['semester']): bucket for bucket in buckets}
 
-            if year not in grouped_results:
-                grouped_results[year] = {}
+        snapshot = roles.get_snapshot(self.request)
+        standings = {}
+        if snapshot.role == 'Student':
+            standings = {
+                (standing.year, standing.semester): standing
+                for standing in models.SemesterStanding.objects.filter(user_id=snapshot.id)
+            }
 
-            if semester not in grouped_results[year]:
-                grouped_results[year][semester] = []
+        context['grouped_results'] = group_results(context['results'], bucket_stats, standings)
 
-            grouped_results[year][semester].append(result)
-
-        context['grouped_results'] = grouped_results
+        if snapshot.role == 'Student':
+            # The fragment shows their name, email and roll too
+            context['cache_version'] = caching.version_token(*_student_page_namespaces(snapshot))
+        else:
+            context['cache_version'] = caching.version_token(caching.RESULTS, caching.STUDENTS, caching.SUBJECTS)
 
         # For filter dropdowns
-        all_results = models.StudentResult.objects.all()
+        result_facets = facets.result_facets()
 
-        context['years'] = all_results.values_list('year', flat=True).distinct()
-        context['semesters'] = all_results.values_list('semester', flat=True).distinct()
-        context['classes'] = all_results.values_list(
-            'user__studentprofile__class_list',
-            flat=True
-        ).distinct()
+        context['years'] = result_facets['years']
+        context['semesters'] = result_facets['semesters']
+        context['classes'] = result_facets['classes']
 
         context['selected_year'] = self.request.GET.get('year', '')
         context['selected_semester'] = self.request.GET.get('semester', '')
         context['selected_class'] = self.request.GET.get('class', '')
 
+        # Leaderboard from precomputed standings once a semester is picked
+        if snapshot.is_staff and context['selected_year'] and context['selected_semester']:
+            leaderboard = models.SemesterStanding.objects.select_related('user').filter(
+                year=context['selected_year'],
+                semester=context['selected_semester'],
+            )
+            if context['selected_class']:
+                leaderboard = leaderboard.filter(class_list=context['selected_class']).order_by('rank', 'user_id')
+            else:
+                leaderboard = leaderboard.order_by('-average', 'user_id')
+            context['leaderboard'] = leaderboard[:10]
+
         return context
     
     def get_template_names(self):
-        if self.request.user.role == 'Student':
+        snapshot = roles.get_snapshot(self.request)
+        if snapshot.role == 'Student':
             return ["students/student_result_list.html"]
-        elif self.request.user.is_staff:
+        elif snapshot.is_staff:
             return ["students/student_result_list_staff_site.html"]
         return super().get_template_names()
     
+class CSVExportView(mixins.LoginRequiredMixin, mixins.StudentRecordFilterMixin, generic.View):
+    """
+    Stream filtered records as CSV straight from a values_list iterator, so
+    memory stays flat however many rows are exported.
+    """
+    model = None
+    queryset = None
+    filename = 'export.csv'
+    header = ()
+    columns = ()
+    ordering = ()
+    chunk_size = 2000
+    
+    def get_queryset(self):
+        # As in Django's list views: ``queryset`` if set, else every ``model`` row
+        if self.queryset is not None:
+            return self.queryset.all()
+        return self.model._default_manager.all()
+    
+    def get_rows(self):
+        queryset = self.filter_records(self.get_queryset()).order_by(*self.ordering).values_list(*self.columns)
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.header)
+        for row in queryset.iterator(chunk_size=self.chunk_size):
+            yield writer.writerow(row)
+    
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(self.get_rows(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{self.filename}"'
+        return response
+    
+    
+class StudentResultExportView(CSVExportView):
+    model = models.StudentResult
+    filename = 'student_results.csv'
+    filter_lookups = StudentResultListView.filter_lookups
+    header = ('Year', 'Semester', 'Class', 'Roll', 'First Name', 'Last Name', 'Email', 'Subject', 'CGPA')
+    columns = (
+        'year',
+        'semester',
+        'user__studentprofile__class_list',
+        'user__studentprofile__roll',
+        'user__first_name',
+        'user__last_name',
+        'user__email',
+        'subject__subject',
+        'cgpa',
+    )
+    ordering = ('-year', 'semester', 'id')
+    
 class StudentResultDeleteView(mixins.StaffRequiredMixin, generic.DeleteView):
     template_name = "students/student_result_delete.html"
     context_object_name = 'student'
@@ -382,10 +670,13 @@ class AssignAllSubjectView(mixins.StaffRequiredMixin, generic.CreateView):
     def get_success_url(self):
         return reverse('accounts:subject_list')
     
-class SubjectListView(mixins.StaffRequiredMixin, generic.ListView):
+class SubjectListView(mixins.StaffRequiredMixin, mixins.CachedResponseMixin, generic.ListView):
     template_name = "staffs/subject_list.html"
     context_object_name = 'subjects'
     
+    def get_cache_namespaces(self):
+        return [caching.SUBJECTS]
+
     def get_queryset(self):
         return models.Subject.objects.all()
     
@@ -409,6 +700,81 @@ class SubjectUpdateView(mixins.StaffRequiredMixin, generic.UpdateView):
         return reverse('accounts:subject_list')
     
 
+class JobListView(mixins.StaffRequiredMixin, mixins.KeysetPaginationMixin, generic.ListView):
+    template_name = "staffs/job_list.html"
+    context_object_name = 'jobs'
+    paginate_by = 25
+    # Jobs staff may start by hand from this page
+    manual_tasks = (
+        ('rebuild_attendance_summary', 'Rebuild attendance summary'),
+        ('rebuild_standings', 'Rebuild semester standings'),
+    )
+
+    def get_queryset(self):
+        return models.Job.objects.select_related('created_by').defer('arguments', 'result', 'error')
+
+    def post(self, request, *args, **kwargs):
+        name = request.POST.get('task')
+        if name not in dict(self.manual_tasks):
+            return redirect('accounts:job_list')
+        job = tasks.enqueue(name, user_id=roles.get_snapshot(request).id)
+        return redirect('accounts:job_detail', pk=job.pk)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['manual_tasks'] = self.manual_tasks
+        return context
+
+
+class JobDetailView(mixins.StaffRequiredMixin, generic.DetailView):
+    template_name = "staffs/job_detail.html"
+    context_object_name = 'job'
+
+    def get_queryset(self):
+        return models.Job.objects.select_related('created_by')
+
+
+class RequestProfileView(mixins.StaffRequiredMixin, generic.TemplateView):
+    template_name = "staffs/request_profile.html"
+
+    def post(self, request, *args, **kwargs):
+        middleware.stats.clear()
+        return redirect('accounts:request_profile')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['enabled'] = settings.REQUEST_PROFILING
+        context['window'] = middleware.stats.size
+        context['views'] = middleware.stats.summary()
+        return context
+
+
+class ClassReportView(mixins.StaffRequiredMixin, generic.TemplateView):
+    template_name = "staffs/class_report.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        selected_year = self.request.GET.get('year', '')
+        selected_semester = self.request.GET.get('semester', '')
+        selected_class = self.request.GET.get('class', '')
+
+        # Templates call these lazily, so a cached fragment skips them entirely
+        context['grades'] = functools.partial(analytics.grade_report, selected_year, selected_semester, selected_class)
+        context['attendance'] = functools.partial(analytics.attendance_report, selected_class)
+        context['pass_cgpa'] = analytics.PASS_CGPA
+        context['cache_version'] = caching.version_token(
+            caching.RESULTS, caching.ATTENDANCE, caching.STUDENTS, caching.SUBJECTS
+        )
+
+        result_facets = facets.result_facets()
+        context['years'] = result_facets['years']
+        context['semesters'] = result_facets['semesters']
+        context['classes'] = facets.class_facets()
+        context['selected_year'] = selected_year
+        context['selected_semester'] = selected_semester
+        context['selected_class'] = selected_class
+        return context
+
     
 class StudentAddAttendanceView(mixins.StaffRequiredMixin, generic.CreateView):
     template_name = "students/student_add_attendance.html"
@@ -433,26 +799,145 @@ class StudentAddAttendanceView(mixins.StaffRequiredMixin, generic.CreateView):
         return reverse('accounts:student_attendance_list')
     
     
-class StudentAttendanceView(auth_mixins.LoginRequiredMixin, generic.ListView):
+class StudentClassAttendanceView(mixins.StaffRequiredMixin, generic.FormView):
+    """
+    Mark today's attendance for a whole class and subject in one post.
+    """
+    template_name = "students/student_class_attendance.html"
+    form_class = forms.ClassAttendanceForm
+    
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        if self.request.method == 'GET' and 'class_list' in self.request.GET:
+            kwargs['data'] = self.request.GET
+        return kwargs
+    
+    def get_roster(self, form):
+        return models.StudentProfile.objects.select_related('user').filter(
+            user__role='Student',
+            class_list=form.cleaned_data['class_list']
+        ).order_by('roll')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = context['form']
+        
+        if form.is_bound and form.is_valid():
+            roster = list(self.get_roster(form))
+            marked = dict(
+                models.StudentAttendance.objects.filter(
+                    roll__in=roster,
+                    subject=form.cleaned_data['subject'],
+                    created_at=timezone.localdate()
+                ).values_list('roll_id', 'status')
+            )
+            for profile in roster:
+                profile.status = marked.get(profile.pk, 'Absent')
+            context['roster'] = roster
+            
+        context['status_choices'] = models.StudentAttendance._meta.get_field('status').choices
+        return context
+    
+    def form_valid(self, form):
+        subject = form.cleaned_data['subject']
+        today = timezone.localdate()
+        valid_statuses = {value for value, label in models.StudentAttendance._meta.get_field('status').choices}
+        
+        records = []
+        for profile in self.get_roster(form):
+            status = self.request.POST.get(f'status_{profile.pk}')
+            if status not in valid_statuses:
+                continue
+            records.append(models.StudentAttendance(
+                user_id=profile.user_id,
+                roll=profile,
+                subject=subject,
+                status=status,
+                created_at=today,
+            ))
+        
+        with transaction.atomic():
+            models.StudentAttendance.objects.bulk_create(
+                records,
+                update_conflicts=True,
+                unique_fields=['roll', 'subject', 'created_at'],
+                update_fields=['user', 'status', 'updated_at'],
+            )
+            signals.attendance_bulk_saved.send(
+                sender=models.StudentAttendance,
+                user_ids=[record.user_id for record in records],
+                subject=subject,
+            )
+        
+        return super().form_valid(form)
+    
+    def get_success_url(self):
+        return reverse('accounts:student_attendance_list')
+    
+    
+class StudentAttendanceView(mixins.LoginRequiredMixin, mixins.StudentRecordFilterMixin, mixins.KeysetPaginationMixin, mixins.ConditionalGetMixin, generic.ListView):
     template_name = "students/student_attendance_list.html"
     context_object_name = 'attendance_records'
+    cursor_fields = ('-created_at', '-id')
+    filter_lookups = {
+        'year': 'created_at__year',
+        'class': 'user__studentprofile__class_list',
+        'subject': 'subject',
+    }
+    filter_form_class = forms.AttendanceFilterForm
+    
+    def get_validators(self):
+        snapshot = roles.get_snapshot(self.request)
+        if snapshot.role != 'Student':
+            return None, None
+        # Class counts change the totals without touching attendance rows
+        self.attendance_totals = models.AttendanceSummary.objects.totals_for(snapshot.id)
+        return student_page_validators(
+            snapshot,
+            models.StudentAttendance.objects.filter(user_id=snapshot.id),
+            *self.attendance_totals.values(),
+        )
     
     def get_queryset(self):
         queryset = models.StudentAttendance.objects.select_related(
             'user',
             'user__studentprofile',
             'subject'
-        ).prefetch_related(
-            'user__totalclasses'
-        ).filter(
+        ).with_total_classes().filter(
             user__role = 'Student'
         ).order_by(
             '-created_at'
         )
         
-        if self.request.user.role == "Student":
-            queryset = queryset.filter(user=self.request.user)
-        return queryset
+        return self.filter_records(queryset)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        snapshot = roles.get_snapshot(self.request)
+        if snapshot.role == "Student":
+            # Already loaded by get_validators() on normal GETs
+            totals = getattr(self, 'attendance_totals', None) or models.AttendanceSummary.objects.totals_for(snapshot.id)
+            context.update(totals)
+        context['class_choices'] = [value for value, label in models.StudentProfile.CLASS_CHOICES]
+        return context
+    
+class StudentAttendanceExportView(CSVExportView):
+    queryset = models.StudentAttendance.objects.filter(user__role='Student')
+    filename = 'student_attendance.csv'
+    filter_lookups = StudentAttendanceView.filter_lookups
+    filter_form_class = StudentAttendanceView.filter_form_class
+    header = ('Date', 'Class', 'Roll', 'First Name', 'Last Name', 'Email', 'Subject', 'Status')
+    columns = (
+        'created_at',
+        'user__studentprofile__class_list',
+        'user__studentprofile__roll',
+        'user__first_name',
+        'user__last_name',
+        'user__email',
+        'subject__subject',
+        'status',
+    )
+    ordering = ('-created_at', '-id')
     
 class StdentAttendanceUpdateView(mixins.StaffRequiredMixin, generic.UpdateView):
     template_name = "students/student_update_attendance.html"
@@ -490,3 +975,180 @@ class StdentAttendanceUpdateView(mixins.StaffRequiredMixin, generic.UpdateView):
     
 
     
+class AsyncPageView(mixins.CachedResponseMixin, generic.View):
+    """
+    Base for async copies of read-only pages, for running under ASGI (see
+    student_management/asgi.py). Queries go through the async ORM and the
+    context is fully loaded before rendering, so templates never query.
+
+    Subclasses implement ``check_access``, ``get_context`` and optionally
+    ``get_validators``; responses get the same ETag/Last-Modified handling
+    as ConditionalGetMixin and the same per-session page cache as
+    CachedResponseMixin.
+    """
+    template_name = None
+
+    def check_access(self, snapshot):
+        """
+        Return a response to send instead of the page, or None.
+        """
+        return None
+
+    async def get_validators(self, snapshot):
+        return None, None
+
+    async def get_context(self, snapshot):
+        return {}
+
+    async def get(self, request, *args, **kwargs):
+        snapshot = await roles.aget_snapshot(request)
+        response = self.check_access(snapshot)
+        if response is not None:
+            return response
+
+        etag, last_modified = await self.get_validators(snapshot)
+        etag = quote_etag(etag) if etag else None
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+        if response is None:
+            response = await self.render_page(snapshot)
+        if etag:
+            response.headers.setdefault('ETag', etag)
+        if timestamp and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(timestamp)
+        if etag or timestamp:
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    async def render_page(self, snapshot):
+        namespaces = self.get_cache_namespaces()
+        key = None
+        if namespaces is not None and self.request.session.session_key:
+            key = await self.aget_cache_key(namespaces)
+            content = await cache.aget(key)
+            if content is not None:
+                return HttpResponse(content)
+
+        response = render(self.request, self.template_name, await self.get_context(snapshot))
+        if key:
+            await cache.aset(key, response.content, self.cache_timeout)
+        return response
+
+
+class AsyncStudentPageView(mixins.StudentRecordFilterMixin, mixins.KeysetPaginationMixin, AsyncPageView):
+    """
+    A student's own list page. Everyone else gets the sync page, which has
+    the staff filters and leaderboard.
+    """
+    sync_url_name = None
+
+    def check_access(self, snapshot):
+        if not snapshot.is_authenticated:
+            return redirect_to_login(self.request.get_full_path())
+        if snapshot.role != 'Student':
+            url = reverse(self.sync_url_name)
+            if self.request.GET:
+                url = f'{url}?{self.request.GET.urlencode()}'
+            return redirect(url)
+        return None
+
+    async def get_page(self, queryset):
+        rows = [row async for row in self.seek_queryset(queryset, self.paginate_by)]
+        return self.paginate_rows(rows, self.paginate_by)[2]
+
+
+class AsyncStudentResultListView(AsyncStudentPageView):
+    template_name = "students/student_result_list.html"
+    sync_url_name = 'accounts:student_result_list'
+    cursor_fields = StudentResultListView.cursor_fields
+    filter_lookups = StudentResultListView.filter_lookups
+
+    def get_cache_namespaces(self):
+        snapshot = roles.get_snapshot(self.request)
+        return [caching.student_namespace(snapshot.id), caching.SUBJECTS]
+
+    async def get_validators(self, snapshot):
+        return await astudent_page_validators(snapshot, models.StudentResult.objects.filter(user_id=snapshot.id))
+
+    async def get_context(self, snapshot):
+        queryset = self.filter_records(
+            models.StudentResult.objects.select_related('user', 'user__studentprofile', 'subject')
+        )
+        results = await self.get_page(queryset)
+
+        buckets = [
+            bucket async for bucket in queryset.order_by().values('year', 'semester').annotate(
+                total=Count('id'),
+                average=Avg('cgpa'),
+            ).order_by('-year', 'semester')
+        ]
+        bucket_stats = {(bucket['year'], bucket['semester']): bucket for bucket in buckets}
+        standings = {
+            (standing.year, standing.semester): standing
+            async for standing in models.SemesterStanding.objects.filter(user_id=snapshot.id)
+        }
+
+        return {
+            'results': results,
+            'buckets': buckets,
+            'grouped_results': group_results(results, bucket_stats, standings),
+            'cache_version': await caching.aversion_token(*_student_page_namespaces(snapshot)),
+            'selected_year': self.request.GET.get('year', ''),
+            'selected_semester': self.request.GET.get('semester', ''),
+            'selected_class': self.request.GET.get('class', ''),
+            **self.get_pagination_context(),
+        }
+
+
+class AsyncStudentAttendanceView(AsyncStudentPageView):
+    template_name = "students/student_attendance_list.html"
+    sync_url_name = 'accounts:student_attendance_list'
+    cursor_fields = StudentAttendanceView.cursor_fields
+    filter_lookups = StudentAttendanceView.filter_lookups
+    filter_form_class = StudentAttendanceView.filter_form_class
+
+    async def get_validators(self, snapshot):
+        self.attendance_totals = await models.AttendanceSummary.objects.atotals_for(snapshot.id)
+        return await astudent_page_validators(
+            snapshot,
+            models.StudentAttendance.objects.filter(user_id=snapshot.id),
+            *self.attendance_totals.values(),
+        )
+
+    async def get_context(self, snapshot):
+        queryset = self.filter_records(
+            models.StudentAttendance.objects.select_related(
+                'user', 'user__studentprofile', 'subject'
+            ).with_total_classes()
+        )
+        return {
+            'attendance_records': await self.get_page(queryset),
+            'class_choices': [value for value, label in models.StudentProfile.CLASS_CHOICES],
+            **self.attendance_totals,
+            **self.get_pagination_context(),
+        }
+
+
+class AsyncStudentDetailView(AsyncPageView):
+    template_name = "students/student_detail.html"
+
+    def check_access(self, snapshot):
+        if not snapshot.is_authenticated:
+            return redirect_to_login(self.request.get_full_path())
+        if not snapshot.is_staff:
+            return redirect("home")
+        return None
+
+    def get_cache_namespaces(self):
+        pk = self.kwargs['pk']
+        return [caching.user_namespace(pk), caching.student_namespace(pk)]
+
+    async def get_context(self, snapshot):
+        try:
+            student = await models.User.objects.select_related('studentprofile').aget(
+                role='Student', pk=self.kwargs['pk'],
+            )
+        except models.User.DoesNotExist:
+            raise Http404("No student found matching the query")
+        return {'student': student, 'object': student}
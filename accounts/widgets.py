@@ -0,0 +1,42 @@
+from django import forms
+from django.urls import reverse
+from django.utils.html import format_html
+from . import models
+
+
+class StudentAutocompleteWidget(forms.Widget):
+    """
+    Text box backed by the student autocomplete endpoint; the selected
+    StudentProfile pk is posted through a hidden input. Unlike a Select it
+    never renders the full list of students.
+    """
+    def render(self, name, value, attrs=None, renderer=None):
+        attrs = self.build_attrs(self.attrs, attrs)
+        input_id = attrs.pop('id', f'id_{name}')
+
+        label = ''
+        if value:
+            profile = models.StudentProfile.objects.select_related('user').filter(pk=value).first()
+            if profile:
+                label = autocomplete_label(profile)
+
+        return format_html(
+            '<input type="hidden" name="{name}" id="{id}" value="{value}">'
+            '<input type="text" id="{id}_search" value="{label}" class="{css}" autocomplete="off" '
+            'placeholder="Search by roll or name..." list="{id}_options" '
+            'data-autocomplete-url="{url}" data-autocomplete-target="{id}">'
+            '<datalist id="{id}_options"></datalist>',
+            name=name,
+            id=input_id,
+            value=value or '',
+            label=label,
+            css=attrs.get('class', ''),
+            url=reverse('accounts:student_autocomplete'),
+        )
+
+    def value_from_datadict(self, data, files, name):
+        return data.get(name)
+
+
+def autocomplete_label(profile):
+    return f'{profile.roll} - {profile.user.first_name} {profile.user.last_name}'
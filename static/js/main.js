@@ -1 +1,32 @@
 console.log("Connection test");
+
+// Student autocomplete: fills the datalist from the JSON endpoint and
+// copies the chosen student's id into the hidden form field.
+document.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll("[data-autocomplete-url]").forEach((input) => {
+        const hidden = document.getElementById(input.dataset.autocompleteTarget);
+        const options = document.getElementById(input.getAttribute("list"));
+        const ids = new Map();
+        let timer = null;
+
+        input.addEventListener("input", () => {
+            hidden.value = ids.get(input.value) || "";
+            clearTimeout(timer);
+            timer = setTimeout(async () => {
+                const query = input.value.trim();
+                if (!query || ids.has(input.value)) return;
+                const response = await fetch(`${input.dataset.autocompleteUrl}?q=${encodeURIComponent(query)}`);
+                const data = await response.json();
+                options.innerHTML = "";
+                ids.clear();
+                data.results.forEach((item) => {
+                    ids.set(item.text, item.id);
+                    const option = document.createElement("option");
+                    option.value = item.text;
+                    options.appendChild(option);
+                });
+                hidden.value = ids.get(input.value) || "";
+            }, 200);
+        });
+    });
+});
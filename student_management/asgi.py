@@ -3,6 +3,23 @@ ASGI config for student_management project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Under an ASGI server the async views (``/accounts/students/async/...``:
+a student's results and attendance, and the staff student detail page) run
+on the event loop, and the rest of the site runs in a thread as usual.
+Uvicorn is not a dependency of the project; install it on the server::
+
+    pip install uvicorn
+    uvicorn student_management.asgi:application --workers 4
+
+Use one worker per CPU core. Django advises against persistent connections
+under ASGI, so set CONN_MAX_AGE to 0 (settings_production sets 600 for
+SQLite under WSGI). For pooling, use PostgreSQL (``POSTGRES_DB``), whose
+psycopg pool is set up in settings.py. Keep REQUEST_PROFILING off: that
+middleware is sync only and would push the async views back onto a thread.
+
+``manage.py benchmark_async_views`` compares the three ways of serving
+these pages on a scratch database.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -0,0 +1,67 @@
+"""
+Production settings: the development settings plus a tuned SQLite setup
+(unless PostgreSQL is configured through ``POSTGRES_DB``).
+
+Run with ``DJANGO_SETTINGS_MODULE=student_management.settings_production``.
+The cache defaults to the file backend here (CACHE_BACKEND=redis for
+several boxes).
+
+Every new connection runs the PRAGMAs in ``init_command``:
+
+* ``journal_mode=WAL`` lets readers keep working while attendance is being
+  written, instead of the whole file being locked for each write.
+* ``synchronous=NORMAL`` is safe under WAL and only fsyncs at checkpoints.
+* ``mmap_size`` / ``cache_size`` keep the hot pages (users, profiles,
+  summaries) in memory.
+* ``busy_timeout`` makes a writer wait for the lock rather than fail with
+  "database is locked".
+
+Transactions start as ``IMMEDIATE`` so a writer takes the write lock up
+front; a deferred transaction that reads first and then tries to upgrade
+can't be retried by busy_timeout and fails straight away.
+
+To measure the difference, compare the two profiles on the same box::
+
+    python manage.py benchmark_attendance_writes --settings=student_management.settings
+    python manage.py benchmark_attendance_writes --settings=student_management.settings_production
+"""
+import os
+
+# Role snapshots and cached pages are invalidated through the cache, so
+# every worker process has to share it (``check --deploy`` enforces this)
+os.environ.setdefault('CACHE_BACKEND', 'file')
+
+from .settings import *  # noqa: E402,F401,F403
+
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+
+
+# PostgreSQL (POSTGRES_DB) is configured in settings.py and left as is
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            # Reuse connections across requests; health checks drop broken ones
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                # Seconds sqlite3 waits for a lock (same effect as busy_timeout)
+                'timeout': 20,
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA mmap_size=268435456;'
+                    'PRAGMA busy_timeout=20000;'
+                    'PRAGMA cache_size=-65536;'
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+            },
+        }
+    }